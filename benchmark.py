@@ -0,0 +1,220 @@
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import lab1
+import lab4
+from lexer import LexerGenerator, lab1_specification
+
+STATEMENTS = [
+    "invoc {0} = {1} ;\n",
+    "while ( {0} <= {1} ) {{ {0} = {0} + 1 ; }}\n",
+    "ciki ( {0} == {1} ) {{ scrie_pe_cer ( {0} ) ; }} else {{ {0} = {0} * {1} ; }}\n",
+    "for ( {0} = 0 ; {0} != {1} ; {0} ++ ) {{ return {0} ; }}\n",
+]
+
+
+class LegacyHashTable:
+    """
+    The fixed-size chained table lab1 used before, kept to compare the throughput.
+    """
+
+    def __init__(self, size=100):
+        self.size = size
+        self.table = [None] * self.size
+
+    def put(self, key, value):
+        index = hash(key) % self.size
+        if self.table[index] is None:
+            self.table[index] = [(key, value)]
+        else:
+            for i, (k, v) in enumerate(self.table[index]):
+                if k == key:
+                    self.table[index][i] = (key, value)
+                    return
+            self.table[index].append((key, value))
+
+    def get(self, key):
+        index = hash(key) % self.size
+        if self.table[index] is not None:
+            for k, v in self.table[index]:
+                if k == key:
+                    return v
+        return None
+
+    def __len__(self):
+        return sum(len(entry) for entry in self.table if entry)
+
+
+def generate_program(size, identifiers=1000, seed=0):
+    """
+    :param size: number of characters of the program
+    :param identifiers: number of distinct identifiers used
+    :return: Text of a lexically correct program for the lab1 scanner.
+    """
+    generator = random.Random(seed)
+    names = ['v{}'.format(index) for index in range(identifiers)]
+    parts = []
+    length = 0
+    while length < size:
+        statement = generator.choice(STATEMENTS).format(generator.choice(names), generator.randint(1, 10 ** 6))
+        parts.append(statement)
+        length += len(statement)
+    return ''.join(parts)
+
+
+def bench_scanner(size):
+    """
+    Scans a generated program of size characters with lab1.analyze_program.
+    :return: (number of tokens, seconds, MB/s)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.txt')
+        with open(path, 'w') as file:
+            file.write(generate_program(size))
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            symbol_table, pif = lab1.analyze_program(path)
+        elapsed = time.perf_counter() - start
+        assert pif is not None
+        return len(pif), elapsed, size / elapsed / 1e6
+
+
+def bench_stream(size):
+    """
+    Scans a generated program of size characters with lab1.scan, writing the PIF while it is scanned.
+    The scan is timed, then run again under tracemalloc, which slows it down, for its peak memory.
+    :return: (number of tokens, seconds, peak of the memory traced during the scan in bytes)
+    """
+    def run(path):
+        tokens = 0
+        with open(os.devnull, 'w') as devnull:
+            for token, code, _ in lab1.scan(path, lab1.HashTable()):
+                devnull.write(f"{token} -> {code}\n")
+                tokens += 1
+        return tokens
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.txt')
+        with open(path, 'w') as file:
+            file.write(generate_program(size))
+        start = time.perf_counter()
+        tokens = run(path)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        run(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return tokens, elapsed, peak
+
+
+def bench_directory(files, size, workers):
+    """
+    Scans files generated programs of size characters each with lab1.analyze_directory.
+    :return: (number of identifiers of the global symbol table, seconds, MB/s)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(files):
+            with open(os.path.join(directory, 'program{}.txt'.format(index)), 'w') as file:
+                file.write(generate_program(size, seed=index))
+        start = time.perf_counter()
+        symbol_table, pifs, errors = lab1.analyze_directory(directory, workers)
+        elapsed = time.perf_counter() - start
+        assert not errors
+        return len(symbol_table), elapsed, files * size / elapsed / 1e6
+
+
+def bench_batch_acceptance(count, length=20, seed=0):
+    """
+    Checks count random sequences of at most length symbols against the automaton of fa.in, one at a time with
+    check_sequence and all together with check_batch (vectorized when numpy is installed), then, with numpy, with
+    check_batch on the sequences encoded before.
+    :return: (seconds of the loop, seconds of the batch, seconds of the batch of encoded sequences or None)
+    """
+    automaton = lab4.FiniteAutomaton(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fa.in'))
+    generator = random.Random(seed)
+    sequences = [''.join(generator.choice('01') for _ in range(generator.randint(1, length))) for _ in range(count)]
+    start = time.perf_counter()
+    expected = [automaton.check_sequence(sequence) for sequence in sequences]
+    loop_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    accepted = automaton.check_batch(sequences)
+    batch_elapsed = time.perf_counter() - start
+    assert accepted == expected
+    if lab4.numpy is None:
+        return loop_elapsed, batch_elapsed, None
+    compiled = automaton.compile()
+    ids, lengths = compiled.encode(sequences)
+    start = time.perf_counter()
+    accepted = compiled.check_batch(ids, lengths)
+    encoded_elapsed = time.perf_counter() - start
+    assert accepted == expected
+    return loop_elapsed, batch_elapsed, encoded_elapsed
+
+
+def bench_lexer(size):
+    """
+    Scans a generated program of size characters with the lexer generated from the lab1 specification.
+    :return: (number of states of the minimized DFA, number of tokens, seconds, MB/s)
+    """
+    generator = LexerGenerator(lab1_specification(lab1.keywords, lab1.operators, lab1.delimiters))
+    lexer = generator.lexer()
+    text = generate_program(size)
+    start = time.perf_counter()
+    tokens = sum(1 for _ in lexer.tokens(text))
+    elapsed = time.perf_counter() - start
+    return generator.state_count(), tokens, elapsed, size / elapsed / 1e6
+
+
+def bench_hash_table(table_class, count):
+    """
+    Puts count distinct identifiers, gets each of them and calls len once per put.
+    :return: (seconds for the puts, seconds for the gets)
+    """
+    keys = ['identifier{}'.format(index) for index in range(count)]
+    table = table_class()
+    start = time.perf_counter()
+    for key in keys:
+        table.put(key, 'identifier')
+        len(table)
+    put_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for key in keys:
+        table.get(key)
+    return put_elapsed, time.perf_counter() - start
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000000, 10000000]
+    for count in (1000, 10000, 50000):
+        for name, table_class in (('legacy', LegacyHashTable), ('resizable', lab1.HashTable)):
+            put_elapsed, get_elapsed = bench_hash_table(table_class, count)
+            print('{0} HashTable, {1:,} identifiers: {2:,.0f} puts/s, {3:,.0f} gets/s'.format(
+                name, count, count / put_elapsed, count / get_elapsed))
+    loop_elapsed, batch_elapsed, encoded_elapsed = bench_batch_acceptance(1000000)
+    print('1,000,000 sequences against fa.in: check_sequence {0:.3f}s, check_batch {1:.3f}s ({2})'.format(
+        loop_elapsed, batch_elapsed, 'numpy' if lab4.numpy is not None else 'without numpy'))
+    if encoded_elapsed is not None:
+        print('1,000,000 encoded sequences against fa.in: check_batch {0:.3f}s'.format(encoded_elapsed))
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        identifiers, elapsed, throughput = bench_directory(16, 250000, workers)
+        print('directory scan, 16 files, {0} workers: {1:,} identifiers in {2:.3f}s -> {3:.2f} MB/s'.format(
+            workers, identifiers, elapsed, throughput))
+    for size in sizes:
+        tokens, elapsed, throughput = bench_scanner(size)
+        print('scanner, {0:,} characters: {1:,} tokens in {2:.3f}s -> {3:.2f} MB/s'.format(
+            size, tokens, elapsed, throughput))
+        tokens, elapsed, peak = bench_stream(size)
+        print('streaming scanner, {0:,} characters: {1:,} tokens in {2:.3f}s, peak memory {3:,.1f} MB'.format(
+            size, tokens, elapsed, peak / 1e6))
+        states, tokens, elapsed, throughput = bench_lexer(size)
+        print('DFA lexer ({0} states), {1:,} characters: {2:,} tokens in {3:.3f}s -> {4:.2f} MB/s'.format(
+            states, size, tokens, elapsed, throughput))
+
+
+if __name__ == "__main__":
+    main()
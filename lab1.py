@@ -1,38 +1,127 @@
+import concurrent.futures
+import os
 import re
+import sys
+import zlib
+from array import array
+
+import pif as binary_pif
+from lexer import LexerGenerator, lab1_specification
+
+# characters read at a time by the streaming scanner
+CHUNK_SIZE = 1 << 20
 
 class HashTable:
+    """
+    Resizable open-addressing table: the entries are kept in insertion order in parallel lists and an array of
+    slots, at most 2/3 full and doubled when needed, holds their indexes, so put, get and len are O(1).
+    Every key also gets a (bucket, position) code, the place it would have in a chained table of size buckets:
+    the bucket comes from a deterministic hash and the position is the number of keys put before in that bucket.
+    The codes never change when the slots grow, they are the references written in the PIF.
+    """
+    EMPTY = -1
+
     def __init__(self, size=100):
         self.size = size
-        self.table = [None] * self.size
+        self._keys = []
+        self._values = []
+        self._codes = []
+        self._hashes = []
+        self._bucket_lengths = [0] * size
+        self._slots = array('q', [HashTable.EMPTY]) * 8
+        self._mask = 7
+
+    @staticmethod
+    def _bucket_hash(key):
+        if isinstance(key, str):
+            return zlib.crc32(key.encode())
+        return hash(key)
 
-    def _hash(self, key):
-        return hash(key) % self.size
+    def _find(self, key, key_hash):
+        """
+        :return: (slot of the key, index of its entry) or (first empty slot, -1) if the key is missing.
+        """
+        slots = self._slots
+        mask = self._mask
+        slot = key_hash & mask
+        index = slots[slot]
+        # the first probe finds the key most of the time
+        if index != HashTable.EMPTY and self._keys[index] == key:
+            return slot, index
+        perturb = key_hash & 0xFFFFFFFFFFFFFFFF
+        while index != HashTable.EMPTY:
+            if self._hashes[index] == key_hash and self._keys[index] == key:
+                return slot, index
+            perturb >>= 5
+            slot = (slot * 5 + perturb + 1) & mask
+            index = slots[slot]
+        return slot, -1
+
+    def _resize(self):
+        capacity = len(self._slots) * 2
+        while len(self._keys) * 3 >= capacity * 2:
+            capacity *= 2
+        self._slots = array('q', [HashTable.EMPTY]) * capacity
+        self._mask = capacity - 1
+        for index, key in enumerate(self._keys):
+            slot, _ = self._find(key, self._hashes[index])
+            self._slots[slot] = index
 
     def put(self, key, value):
-        index = self._hash(key)
-        if self.table[index] is None:
-            self.table[index] = [(key, value)]
-        else:
-            for i, (k, v) in enumerate(self.table[index]):
-                if k == key:
-                    self.table[index][i] = (key, value)
-                    return
-            self.table[index].append((key, value))
+        """
+        :return: The (bucket, position) code of the key.
+        """
+        key_hash = hash(key)
+        slot, index = self._find(key, key_hash)
+        if index != -1:
+            self._values[index] = value
+            return self._codes[index]
+        bucket = self._bucket_hash(key) % self.size
+        code = (bucket, self._bucket_lengths[bucket])
+        self._bucket_lengths[bucket] += 1
+        self._slots[slot] = len(self._keys)
+        self._keys.append(key)
+        self._values.append(value)
+        self._codes.append(code)
+        self._hashes.append(key_hash)
+        if len(self._keys) * 3 >= len(self._slots) * 2:
+            self._resize()
+        return code
 
     def get(self, key):
-        index = self._hash(key)
-        if self.table[index] is not None:
-            for k, v in self.table[index]:
-                if k == key:
-                    return v
-        return None
+        _, index = self._find(key, hash(key))
+        return self._values[index] if index != -1 else None
+
+    def code(self, key):
+        """
+        :return: The (bucket, position) code of the key, None if it was never put.
+        """
+        _, index = self._find(key, hash(key))
+        return self._codes[index] if index != -1 else None
+
+    def __contains__(self, key):
+        return self._find(key, hash(key))[1] != -1
 
     def __len__(self):
-        count = 0
-        for entry in self.table:
-            if entry:
-                count += len(entry)
-        return count
+        return len(self._keys)
+
+    def items(self):
+        """
+        :return: Iterator over (key, value, code) in insertion order.
+        """
+        return zip(self._keys, self._values, self._codes)
+
+    @property
+    def table(self):
+        """
+        The entries grouped by bucket as the fixed-size chained table had them, None for an empty bucket.
+        """
+        table = [None] * self.size
+        for key, value, (bucket, position) in self.items():
+            if table[bucket] is None:
+                table[bucket] = []
+            table[bucket].append((key, value))
+        return table
 
 def assign_token_codes(tokens, starting_code):
     code = starting_code
@@ -74,36 +163,136 @@ def initialize_token_codes():
     assign_token_codes(operators, len(token_codes))
     assign_token_codes(delimiters, len(token_codes) + len(operators))
 
+class Tokenizer:
+    """
+    Scanner built once from the token specification: the minimized DFA generated by lexer.LexerGenerator from
+    lab1_specification splits the text into the longest tokens, so e.g. "=-" is the two operators = and -, 3.5 and
+    "hi" are constants. The DFA returns the (kind, code) of every token directly, they are put in the lexer when the
+    DFA is built.
+    """
+
+    def __init__(self, codes):
+        # kind of the specification -> (kind, code) of the token
+        kinds = {None: ('error', None),
+                 'identifier': ('identifier', codes.get("identifier")),
+                 'constant': ('constant', codes.get("constant"))}
+        for kind, tokens in (('keyword', keywords), ('operator', operators), ('delimiter', delimiters)):
+            kinds.update((token, (kind, codes.get(token))) for token in tokens)
+        self._lexer = LexerGenerator(lab1_specification(keywords, operators, delimiters)).lexer(kinds)
+
+    def stream(self, chunks):
+        """
+        Yields (token, kind, code, line, position) for every token of the text given as an iterable of chunks,
+        kind being 'identifier', 'keyword', 'constant', 'operator', 'delimiter' or 'error' (code None) for a
+        character which starts no token, position the offset of the token in the text.
+        A token may cross any number of chunks, see lexer.Lexer.stream.
+        """
+        line = 1
+        for (kind, code), token, position in self._lexer.stream(chunks):
+            yield token, kind, code, line, position
+            if token == '\n':
+                line += 1
+
+    def tokens(self, text):
+        """
+        Yields (token, kind, code, line) for every token of the text, see stream.
+        """
+        for token, kind, code, line, _ in self.stream((text,)):
+            yield token, kind, code, line
+
+def read_chunks(file_name, chunk_size=CHUNK_SIZE):
+    """
+    Yields the text of the file by chunks of chunk_size characters.
+    """
+    with open(file_name, 'r') as program_file:
+        while True:
+            chunk = program_file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def scan(file_name, symbol_table=None, chunk_size=CHUNK_SIZE):
+    """
+    Streaming scanner: yields (token, code, position) for every token of the file while it is read by chunks,
+    so the memory used does not grow with the size of the file. An invalid token has the code None.
+    The identifiers are put in the symbol table when one is given.
+    """
+    for token, kind, code, _, position in tokenizer.stream(read_chunks(file_name, chunk_size)):
+        if kind == 'identifier' and symbol_table is not None:
+            symbol_table.put(token, "identifier")
+        yield token, code, position
+
 def analyze_program(file_name):
     symbol_table = HashTable()
-    pif = [] 
+    pif = []
     lexical_errors = False
-    
-    with open(file_name, 'r') as program_file:
-        line_number = 1
-        for line in program_file:
-            tokens = re.findall(r"[\w]+|[\(\)\;\{\}\[\]\t\n\s]|[=+-/\*%]+|\>\=|\<\=|\=\=|\!\=|\|\|", line)
-            for token in tokens:
-                if is_identifier(token) and not is_keyword(token):
-                    symbol_table.put(token, "identifier")
-                    pif.append((token, 0)) 
-                elif is_keyword(token):
-                    pif.append((token, token_codes.get(token)))
-                elif is_operator(token):
-                    pif.append((token, token_codes.get(token)))
-                elif is_delimiter(token):
-                    pif.append((token, token_codes.get(token)))
-                elif is_constant(token):
-                    pif.append((token, token_codes.get("constant")))
-                else:
-                    print(f"Lexical error at line {line_number}: Invalid token '{token}'")
-                    lexical_errors = True
-                line_number += 1
+
+    for token, kind, code, line_number, _ in tokenizer.stream(read_chunks(file_name)):
+        if kind == 'error':
+            print(f"Lexical error at line {line_number}: Invalid token '{token}'")
+            lexical_errors = True
+            continue
+        if kind == 'identifier':
+            symbol_table.put(token, "identifier")
+        pif.append((token, code))
 
     if lexical_errors:
         return None, None
     return symbol_table, pif
 
+def _scan_file(file_name):
+    """
+    Scans one file of a multi-file scan with its own symbol table, in a worker process.
+    :return: (keys of the local symbol table in insertion order, PIF as (token, code, index of the key in the
+             local symbol table or -1), lexical error messages)
+    """
+    local_symbols = {}
+    pif = []
+    errors = []
+    for token, kind, code, line_number, _ in tokenizer.stream(read_chunks(file_name)):
+        if kind == 'error':
+            errors.append(f"Lexical error at line {line_number}: Invalid token '{token}'")
+        elif kind == 'identifier':
+            pif.append((token, code, local_symbols.setdefault(token, len(local_symbols))))
+        else:
+            pif.append((token, code, -1))
+    return list(local_symbols), pif, errors
+
+def analyze_programs(file_names, workers=None):
+    """
+    Scans several files in parallel worker processes, each file with a local symbol table, then merges the local
+    tables into one global symbol table and remaps the references of the PIFs to it.
+    The files are merged in the order they are given, whatever order the workers finish in, and the codes of the
+    symbol table come from a deterministic hash, so the output only depends on the files.
+    :param workers: number of worker processes, None for one per core, 1 scans in this process
+    :return: (global symbol table, dictionary file -> PIF as (token, code, (bucket, position) or None),
+              dictionary file -> lexical error messages of the files with errors)
+    """
+    file_names = list(file_names)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = [_scan_file(file_name) for file_name in file_names]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_scan_file, file_names))
+    symbol_table = HashTable()
+    pifs = {}
+    errors = {}
+    for file_name, (keys, pif, file_errors) in zip(file_names, results):
+        codes = [symbol_table.put(key, "identifier") for key in keys]
+        pifs[file_name] = [(token, code, codes[index] if index != -1 else None) for token, code, index in pif]
+        if file_errors:
+            errors[file_name] = file_errors
+    return symbol_table, pifs, errors
+
+def analyze_directory(directory, workers=None):
+    """
+    Scans the files of a directory with analyze_programs, in the order of their names.
+    """
+    file_names = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                        if os.path.isfile(os.path.join(directory, name)))
+    return analyze_programs(file_names, workers)
+
 def write_symbol_table_to_file(symbol_table, output_file_name):
     with open(output_file_name, 'w') as output_file:
         cnt=-1
@@ -117,22 +306,57 @@ def write_symbol_table_to_file(symbol_table, output_file_name):
 def write_pif_to_file(pif, output_file_name):
     with open(output_file_name, 'w') as output_file:
         for entry in pif:
-            token, code = entry
+            token, code = entry[0], entry[1]
             if code!=52 and code != 54:
               output_file.write(f"{token} -> {code}\n")
 
+def write_pif_to_binary_file(pif, symbol_table, output_file_name):
+    """
+    Writes the PIF and the symbol table in the binary format of the pif module, the identifiers referencing their
+    (bucket, position) code in the symbol table. The white space is left out as in write_pif_to_file.
+    """
+    identifier = token_codes.get("identifier")
+    records = ((entry[0], entry[1], symbol_table.code(entry[0]) if entry[1] == identifier else None)
+               for entry in pif if entry[1] != 52 and entry[1] != 54)
+    binary_pif.write(output_file_name, records, symbol_table)
+
+def analyze_directory_to_files(directory, output_directory, workers=None):
+    """
+    Scans the files of a directory with analyze_directory and writes the global symbol table to sym.out and the PIF
+    of every file to <file name>.pif.out and <file name>.pif.bin, in the output directory: the files written are
+    never scanned by the next run, and files differing only by their extension keep distinct PIFs.
+    """
+    symbol_table, pifs, errors = analyze_directory(directory, workers)
+    for file_name, messages in errors.items():
+        for message in messages:
+            print(f"{file_name}: {message}")
+    os.makedirs(output_directory, exist_ok=True)
+    write_symbol_table_to_file(symbol_table, os.path.join(output_directory, "sym.out"))
+    for file_name, pif in pifs.items():
+        output_name = os.path.join(output_directory, os.path.basename(file_name))
+        write_pif_to_file(pif, output_name + ".pif.out")
+        write_pif_to_binary_file(pif, symbol_table, output_name + ".pif.bin")
+    print("Lexically correct" if not errors else "Lexical errors found")
+
 keywords = ["invoc", "bool", "float", "string", "char", "for", "while", "ciki", "else", "scrie_pe_cer", "return"]
 operators = ["++", "+", "-", "**", "*", "/", "%", "=", "==", "!=", "<", ">", "<=", ">=", "||", "!"]
 delimiters = ["(", ")", ";", "{", "}", "[", "]", " ", "\t", "\n"]
 token_codes = HashTable()
 
 initialize_token_codes()
+tokenizer = Tokenizer(token_codes)
 
-symbol_table, pif = analyze_program("p1.txt")
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # lab1.py directory [output directory]
+        analyze_directory_to_files(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "out")
+    else:
+        symbol_table, pif = analyze_program("p1.txt")
 
-if symbol_table is not None:
-    print("Lexically correct")
-    write_symbol_table_to_file(symbol_table, "sym.out")
-    write_pif_to_file(pif, "pif.out")
-else:
-    print("Lexical errors found")
+        if symbol_table is not None:
+            print("Lexically correct")
+            write_symbol_table_to_file(symbol_table, "sym.out")
+            write_pif_to_file(pif, "pif.out")
+            write_pif_to_binary_file(pif, symbol_table, "pif.bin")
+        else:
+            print("Lexical errors found")
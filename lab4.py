@@ -1,8 +1,528 @@
+import bisect
+import heapq
+import itertools
+from array import array
+
+try:
+    import numpy
+except ImportError:  # the batch checks then go through the sequences one at a time
+    numpy = None
+
+# symbol of the transitions taken without reading anything, e.g. q0,ε=q1
+EPSILON = "ε"
+# subsets of states kept by a LazyDfa before its cache is emptied
+DFA_CACHE_LIMIT = 10000
+# sequences of a file checked together by check_file
+BATCH_SIZE = 65536
+
+
+class LazyDfa:
+    def __init__(self, automaton, limit=DFA_CACHE_LIMIT):
+        """
+        Subset construction done on the fly while sequences are checked: every set of states of the automaton
+        reached by a sequence becomes a state of the DFA the first time it is reached, and its transitions are
+        computed the first time they are taken. A later check reusing them costs one dict lookup per symbol.
+        When more than limit sets were discovered the cache is emptied and built again from the sets being used,
+        so the memory stays bounded even for an automaton whose DFA would be exponentially larger.
+        :param automaton: a FiniteAutomaton, possibly non-deterministic
+        """
+        self._automaton = automaton
+        self._limit = limit
+        self._ids = {}
+        self._subsets = []
+        self._accepting = []
+        self._next = {}
+        self.flushes = 0
+        self._start_subset = automaton.epsilon_closure([automaton.initial_state])
+        self.start = self._intern(self._start_subset)
+        self.dead = self._intern(frozenset())
+
+    def _intern(self, subset):
+        state = self._ids.get(subset)
+        if state is None:
+            state = len(self._subsets)
+            self._ids[subset] = state
+            self._subsets.append(subset)
+            self._accepting.append(any(member in self._automaton.final_states for member in subset))
+        return state
+
+    def __len__(self):
+        return len(self._subsets)
+
+    def step(self, state, symbol):
+        """
+        :return: The DFA state reached from the state with the symbol.
+        """
+        target = self._next.get((state, symbol))
+        if target is not None:
+            return target
+        subset = self._automaton.move(self._subsets[state], symbol)
+        if len(self._subsets) >= self._limit:
+            self.flushes += 1
+            self._ids.clear()
+            self._subsets.clear()
+            self._accepting.clear()
+            self._next.clear()
+            # the start and dead states keep their numbers, the state being left is forgotten
+            self._intern(self._start_subset)
+            self._intern(frozenset())
+            return self._intern(subset)
+        target = self._intern(subset)
+        self._next[(state, symbol)] = target
+        return target
+
+    def is_final(self, state):
+        return self._accepting[state]
+
+    def subset(self, state):
+        """
+        :return: frozenset of the states of the automaton making the DFA state.
+        """
+        return self._subsets[state]
+
+    def state_of(self, subset):
+        """
+        :return: The DFA state of the subset of states of the automaton, the numbers change when the cache is
+                 emptied (see flushes).
+        """
+        return self._intern(subset)
+
+    def accepts(self, sequence):
+        state, dead = self.start, self.dead
+        transitions = self._next.get
+        for symbol in sequence:
+            symbol = str(symbol)
+            target = transitions((state, symbol))
+            if target is None:
+                target = self.step(state, symbol)
+            if target == dead:
+                return False
+            state = target
+        return self._accepting[state]
+
+
+class CompiledAutomaton:
+    def __init__(self, automaton):
+        """
+        Minimal DFA of a FiniteAutomaton over integers:
+            • the subset construction gives a DFA of the states reachable from the initial state (for a deterministic
+              automaton every subset has one state), completed with a dead state
+            • Hopcroft's algorithm merges the equivalent states, the states which can not reach a final state
+              become the dead state
+            • the symbols are numbered by columns, the symbols outside of them use the last column, and
+              table[state * width + column] is the next state, the dead state being the last one
+            • final_mask has the bit of every final state set
+        report gives the sizes of the automaton before and after.
+        :param automaton: a FiniteAutomaton, possibly non-deterministic
+        """
+        symbols = [symbol for symbol in dict.fromkeys(list(automaton.alphabet) +
+                                                      [symbol for _, symbol in automaton.transition])
+                   if symbol != EPSILON]
+        rows, accepting, dead = self._determinize(automaton, symbols)
+        block_of, block_count = self._hopcroft(rows, accepting, len(symbols))
+        # the blocks are numbered in the order of their first state, the block of the dead state being the last one
+        order = {}
+        for state in range(len(rows)):
+            if block_of[state] != block_of[dead]:
+                order.setdefault(block_of[state], len(order))
+        order[block_of[dead]] = len(order)
+        self.columns = {symbol: column for column, symbol in enumerate(symbols)}
+        self.width = len(symbols) + 1
+        self.state_count = block_count
+        self.start = order[block_of[0]]
+        self.dead = block_count - 1
+        self.table = array('i', [self.dead]) * (block_count * self.width)
+        self.final_mask = 0
+        for state, row in enumerate(rows):
+            number = order[block_of[state]]
+            for column, target in enumerate(row):
+                self.table[number * self.width + column] = order[block_of[target]]
+            if accepting[state]:
+                self.final_mask |= 1 << number
+        self.report = {'states': len(automaton.states),
+                       'transitions': sum(len(targets) for targets in automaton.transition.values()),
+                       'dfa_states': len(rows), 'minimized_states': block_count,
+                       'table_entries': len(self.table)}
+
+    @staticmethod
+    def _determinize(automaton, symbols):
+        """
+        :return: (transitions of every DFA state as a list indexed by column, whether every state is final,
+                  the dead state), the start state being 0.
+        """
+        final_states = set(automaton.final_states)
+        start = automaton.epsilon_closure([automaton.initial_state])
+        ids = {start: 0}
+        subsets = [start]
+        rows = []
+        for subset in subsets:
+            row = []
+            for symbol in symbols:
+                target = automaton.move(subset, symbol)
+                if target not in ids:
+                    ids[target] = len(subsets)
+                    subsets.append(target)
+                row.append(ids[target])
+            rows.append(row)
+        dead = ids.get(frozenset())
+        if dead is None:
+            dead = len(rows)
+            rows.append([dead] * len(symbols))
+        accepting = [not final_states.isdisjoint(subset) for subset in subsets] + [False] * (len(rows) - len(subsets))
+        return rows, accepting, dead
+
+    @staticmethod
+    def _hopcroft(rows, accepting, symbol_count):
+        """
+        Hopcroft's partition refinement: the states are split into final and non-final blocks, then a block is
+        split whenever some of its states go into a splitter block with a symbol and others do not. Only the
+        smaller half of a split block has to be added to the splitters.
+        :return: (block of every state, number of blocks)
+        """
+        count = len(rows)
+        inverse = [[[] for _ in range(count)] for _ in range(symbol_count)]
+        for state, row in enumerate(rows):
+            for column, target in enumerate(row):
+                inverse[column][target].append(state)
+        blocks = [block for block in ([state for state in range(count) if accepting[state]],
+                                      [state for state in range(count) if not accepting[state]]) if block]
+        blocks = [set(block) for block in blocks]
+        block_of = [0] * count
+        for number, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = number
+        smallest = min(range(len(blocks)), key=lambda number: len(blocks[number]))
+        splitters = {(smallest, column) for column in range(symbol_count)}
+        while splitters:
+            splitter, column = splitters.pop()
+            touched = {}
+            for target in blocks[splitter]:
+                for state in inverse[column][target]:
+                    touched.setdefault(block_of[state], []).append(state)
+            for number, states in touched.items():
+                if len(states) == len(blocks[number]):
+                    continue
+                new = len(blocks)
+                blocks.append(set(states))
+                blocks[number].difference_update(states)
+                for state in states:
+                    block_of[state] = new
+                for other_column in range(symbol_count):
+                    if (number, other_column) in splitters:
+                        splitters.add((new, other_column))
+                    elif len(blocks[new]) < len(blocks[number]):
+                        splitters.add((new, other_column))
+                    else:
+                        splitters.add((number, other_column))
+        return block_of, len(blocks)
+
+    def check(self, sequence):
+        """
+        :return: True if the sequence is accepted, a sequence reaching the dead state is rejected right away.
+        """
+        columns = self.columns.get
+        other = self.width - 1
+        table, width, dead = self.table, self.width, self.dead
+        state = self.start
+        for symbol in sequence:
+            column = columns(symbol)
+            if column is None:
+                column = columns(str(symbol), other)
+            state = table[state * width + column]
+            if state == dead:
+                return False
+        return bool(self.final_mask >> state & 1)
+
+    def is_final(self, state):
+        return bool(self.final_mask >> state & 1)
+
+    def encode(self, sequences):
+        """
+        :param sequences: list of sequences of symbols, a string being the sequence of its characters
+        :return: (numpy array of the columns of the symbols, one row per sequence padded with -1, numpy array of
+                 the lengths of the sequences)
+        """
+        other = self.width - 1
+        lengths = numpy.fromiter((len(sequence) for sequence in sequences), dtype=numpy.int64, count=len(sequences))
+        if all(type(sequence) is str for sequence in sequences) and all(len(symbol) == 1 for symbol in self.columns):
+            # the characters are looked up in a table indexed by their code point
+            points = numpy.frombuffer(''.join(sequences).encode('utf-32-le'), dtype=numpy.uint32)
+            lookup = numpy.full(max([ord(symbol) for symbol in self.columns] + [0]) + 2, other, dtype=numpy.int32)
+            for symbol, column in self.columns.items():
+                lookup[ord(symbol)] = column
+            flat = lookup[numpy.minimum(points, len(lookup) - 1)]
+        else:
+            columns = self.columns.get
+            flat = numpy.fromiter((columns(symbol if type(symbol) is str else str(symbol), other)
+                                   for sequence in sequences for symbol in sequence),
+                                  dtype=numpy.int32, count=int(lengths.sum()))
+        ids = numpy.full((len(sequences), int(lengths.max()) if len(sequences) else 0), -1, dtype=numpy.int32)
+        rows = numpy.repeat(numpy.arange(len(sequences)), lengths)
+        starts = numpy.cumsum(lengths) - lengths
+        ids[rows, numpy.arange(len(flat)) - numpy.repeat(starts, lengths)] = flat
+        return ids, lengths
+
+    def check_batch(self, sequences, lengths=None):
+        """
+        Checks many sequences at once. With numpy all of them go through the table together, one gather per
+        position: the padding uses an extra column leaving every state unchanged, so the sequences of different
+        lengths need no mask. Without numpy every distinct sequence is checked once.
+        :param sequences: iterable of sequences of symbols, or a 2d numpy array of columns (see encode and columns)
+                          with their lengths
+        :param lengths: numpy array with the length of every row of the array, None if the rows are not padded
+        :return: List of booleans, True for every accepted sequence, with or without numpy.
+        """
+        if numpy is None:
+            results = {}
+            accepted = []
+            check = self.check
+            for sequence in sequences:
+                key = sequence if type(sequence) is str else tuple(sequence)
+                result = results.get(key)
+                if result is None:
+                    result = results[key] = check(key)
+                accepted.append(result)
+            return accepted
+        if not isinstance(sequences, numpy.ndarray):
+            sequences, lengths = self.encode(list(sequences))
+        count, length = sequences.shape
+        pad = self.width
+        table = numpy.frombuffer(self.table, dtype=numpy.int32).reshape(self.state_count, self.width)
+        table = numpy.hstack([table, numpy.arange(self.state_count, dtype=numpy.int32)[:, None]])
+        # the columns outside the table are unknown symbols, the positions after the length are padding
+        ids = numpy.where((sequences >= 0) & (sequences < pad), sequences, pad - 1)
+        if lengths is not None:
+            ids[numpy.arange(length)[None, :] >= numpy.asarray(lengths)[:, None]] = pad
+        final = numpy.array([self.is_final(state) for state in range(self.state_count)], dtype=bool)
+        states = numpy.full(count, self.start, dtype=numpy.int32)
+        for position in range(length):
+            states = table[states, ids[:, position]]
+            if not position % 64 and (states == self.dead).all():
+                break
+        return final[states].tolist()
+
+    def search(self, text, overlapping=False):
+        """
+        Finds the non-empty substrings of the text accepted by the automaton in one pass, reading every symbol once.
+        The pass runs the automaton prefixed by .*: at every position a new substring starts in the start state,
+        and the substrings being read are grouped by their DFA state, the groups present at a position being the
+        state of the .* automaton. A group going to the dead state is dropped, a group in a final state gives
+        matches ending at the position.
+        :param text: iterable of symbols, a string giving its characters, e.g. a file read by chunks
+        :param overlapping: True for every accepted substring, False for the leftmost-longest ones: the match
+                            starting first, as long as possible, then the next one after it
+        :return: Iterator over the (start, end) spans of the matches, produced while the text is read: ordered by
+                 end then start if overlapping, by start otherwise.
+        """
+        columns = self.columns.get
+        other = self.width - 1
+        table, width, dead, start_state = self.table, self.width, self.dead, self.start
+        final_mask = self.final_mask
+        # DFA state -> ascending starts of the substrings in that state
+        groups = {}
+        # leftmost-longest: start -> longest end found, and the heap of those starts
+        longest = {}
+        candidates = []
+        # end of the last match found
+        horizon = 0
+        for position, symbol in enumerate(text):
+            column = columns(symbol)
+            if column is None:
+                column = columns(str(symbol), other)
+            starts = groups.get(start_state)
+            groups[start_state] = [position] if starts is None else starts + [position]
+            moved = {}
+            for state, starts in groups.items():
+                target = table[state * width + column]
+                if target == dead:
+                    continue
+                existing = moved.get(target)
+                # the two runs are disjoint and sorted, sorted merges them in linear time
+                moved[target] = starts if existing is None else sorted(existing + starts)
+            groups = moved
+            end = position + 1
+            ends = [starts for state, starts in groups.items() if final_mask >> state & 1]
+            if overlapping:
+                for start in sorted(itertools.chain.from_iterable(ends)):
+                    yield start, end
+                continue
+            for starts in ends:
+                for start in starts:
+                    if start not in longest:
+                        heapq.heappush(candidates, start)
+                    longest[start] = end
+                horizon = end
+            # two substrings in the same state are accepted with the same ends from now on, the later one can only
+            # be a match if a match found before removes the earlier one, which needs it to start before horizon
+            for state, starts in groups.items():
+                index = bisect.bisect_left(starts, horizon) + 1
+                if index < len(starts):
+                    groups[state] = starts[:index]
+            while candidates:
+                candidate = candidates[0]
+                # a substring starting before the candidate, or the candidate itself, may still be accepted
+                if any(starts[0] <= candidate for starts in groups.values()):
+                    # the substrings starting inside the match found for the candidate can never be matches
+                    groups = self._drop_starts(groups, candidate + 1, longest[candidate])
+                    break
+                match_end = self._emit(longest, candidates)
+                yield candidate, match_end
+                groups = self._drop_starts(groups, 0, match_end)
+        while candidates:
+            candidate = candidates[0]
+            yield candidate, self._emit(longest, candidates)
+
+    @staticmethod
+    def _drop_starts(groups, low, high):
+        """
+        :return: The groups without the starts in [low, high), the groups left empty being removed.
+        """
+        dropped = {}
+        for state, starts in groups.items():
+            first, last = bisect.bisect_left(starts, low), bisect.bisect_left(starts, high)
+            if first != last:
+                starts = starts[:first] + starts[last:]
+            if starts:
+                dropped[state] = starts
+        return dropped
+
+    @staticmethod
+    def _emit(longest, candidates):
+        """
+        Removes the first candidate and the candidates starting inside its match.
+        :return: End of the match of the first candidate.
+        """
+        end = longest.pop(heapq.heappop(candidates))
+        while candidates and candidates[0] < end:
+            del longest[heapq.heappop(candidates)]
+        return end
+
+    def automaton(self):
+        """
+        :return: The minimal DFA as a FiniteAutomaton, without its dead state.
+        """
+        symbols = list(self.columns)
+        states = ['q{}'.format(state) for state in range(self.dead)]
+        transition = {}
+        for state in range(self.dead):
+            for column, symbol in enumerate(symbols):
+                target = self.table[state * self.width + column]
+                if target != self.dead:
+                    transition[(states[state], symbol)] = [states[target]]
+        final_states = [states[state] for state in range(self.dead) if self.is_final(state)]
+        # a language without any sentence has only the dead state, its initial state is one without transitions
+        initial_state = states[self.start] if self.start != self.dead else 'q0'
+        return FiniteAutomaton.from_definition(states or ['q0'], symbols, initial_state, final_states, transition)
+
+
+class Matcher:
+    def __init__(self, automaton):
+        """
+        Checks a sequence given in chunks, e.g. read from a stream or a socket, keeping only the current state:
+        nothing is scanned twice and the sequence is never held in memory. Once the dead state is reached the
+        sequence is rejected whatever follows, feed returns False and does not read the chunks any more.
+        The automaton is used as check_sequence uses it: compiled, or through its LazyDfa.
+        :param automaton: a FiniteAutomaton
+        """
+        if automaton._compiled is not None or automaton.is_deterministic():
+            self._compiled = automaton.compile()
+            self._lazy_dfa = None
+            self._start, self._dead = self._compiled.start, self._compiled.dead
+        else:
+            self._compiled = None
+            self._lazy_dfa = automaton.lazy_dfa()
+            self._start, self._dead = self._lazy_dfa.start, self._lazy_dfa.dead
+        self.reset()
+
+    def reset(self):
+        """
+        Starts a new sequence.
+        """
+        self._state = self._start
+        self.position = 0
+        if self._lazy_dfa is not None:
+            # another user of the LazyDfa may empty its cache, the state is then found again from its subset
+            self._flushes = self._lazy_dfa.flushes
+            self._subset = self._lazy_dfa.subset(self._start)
+
+    def _lazy_state(self):
+        if self._lazy_dfa.flushes != self._flushes:
+            self._state = self._lazy_dfa.state_of(self._subset)
+            self._flushes = self._lazy_dfa.flushes
+        return self._state
+
+    def feed(self, chunk):
+        """
+        :param chunk: iterable of the next symbols of the sequence, a string giving its characters
+        :return: False if the sequence was rejected, True if it can still be accepted.
+        """
+        state, dead = self._state, self._dead
+        if state == dead:
+            return False
+        position = self.position
+        if self._compiled is not None:
+            compiled = self._compiled
+            columns = compiled.columns.get
+            other = compiled.width - 1
+            table, width = compiled.table, compiled.width
+            for symbol in chunk:
+                column = columns(symbol)
+                if column is None:
+                    column = columns(str(symbol), other)
+                state = table[state * width + column]
+                position += 1
+                if state == dead:
+                    break
+        else:
+            lazy_dfa = self._lazy_dfa
+            state = self._lazy_state()
+            for symbol in chunk:
+                state = lazy_dfa.step(state, str(symbol))
+                position += 1
+                if state == dead:
+                    break
+            self._flushes = lazy_dfa.flushes
+            self._subset = lazy_dfa.subset(state)
+        self._state, self.position = state, position
+        return state != dead
+
+    @property
+    def rejected(self):
+        """
+        True if no continuation of the symbols fed can be accepted, position is then the number of symbols read.
+        """
+        return self._state == self._dead
+
+    @property
+    def accepted(self):
+        """
+        True if the symbols fed since the last reset form an accepted sequence.
+        """
+        if self._compiled is not None:
+            return self._compiled.is_final(self._state)
+        return self._lazy_dfa.is_final(self._lazy_state())
+
+
 class FiniteAutomaton:
-    def __init__(self, filename):
+    def __init__(self, filename=None):
         self.states, self.alphabet, self.transition = [], [], {}
         self.initial_state, self.final_states = "", []
-        self.read_configuration(filename)
+        self.clear_caches()
+        if filename is not None:
+            self.read_configuration(filename)
+
+    @classmethod
+    def from_definition(cls, states, alphabet, initial_state, final_states, transition):
+        """
+        Builds an automaton without a configuration file, e.g. one generated by a LexerGenerator.
+        :param transition: dictionary (state, symbol) -> list of target states, the symbol EPSILON for the
+                           transitions taken without reading a symbol
+        """
+        automaton = cls()
+        automaton.states, automaton.alphabet = list(states), list(alphabet)
+        automaton.initial_state, automaton.final_states = initial_state, list(final_states)
+        automaton.transition = {pair: list(targets) for pair, targets in transition.items()}
+        return automaton
 
     def read_configuration(self, filename):
         with open(filename) as file:
@@ -10,7 +530,20 @@ class FiniteAutomaton:
             self.alphabet = self.parse_line(file.readline())
             self.initial_state = file.readline().strip()
             self.final_states = self.parse_line(file.readline())
-            self.transition = {tuple(pair): [result] for pair, result in (self.parse_transition_line(line) for line in file)}
+            self.transition = {}
+            for pair, result in (self.parse_transition_line(line) for line in file if line.strip()):
+                targets = self.transition.setdefault(tuple(pair), [])
+                if result not in targets:
+                    targets.append(result)
+        self.clear_caches()
+
+    def clear_caches(self):
+        """
+        Forgets what was computed from the definition, to be called after the definition is changed.
+        """
+        self._lazy_dfa = None
+        self._compiled = None
+        self._deterministic = None
 
     @staticmethod
     def parse_line(line):
@@ -24,26 +557,109 @@ class FiniteAutomaton:
         return tuple(pair.split(",")), result
 
     def is_deterministic(self):
-        return not any(len(values) > 1 for values in self.transition.values())
+        if self._deterministic is None:
+            self._deterministic = not any(len(values) > 1 or symbol == EPSILON
+                                          for (_, symbol), values in self.transition.items())
+        return self._deterministic
 
-    def check_sequence(self, sequence):
-        if self.is_deterministic():
-            state = self.initial_state
-            transitions = self.transition.get
-            return all((state := transitions((state, str(path)), [None])[0]) is not None for path in sequence) and state in self.final_states
-        return False
+    def epsilon_closure(self, states):
+        """
+        :return: frozenset of the states reached from the states through epsilon transitions, them included.
+        """
+        closure = set(states)
+        stack = list(closure)
+        while stack:
+            for target in self.transition.get((stack.pop(), EPSILON), []):
+                if target not in closure:
+                    closure.add(target)
+                    stack.append(target)
+        return frozenset(closure)
+
+    def move(self, states, symbol):
+        """
+        :return: frozenset of the states reached from the states by reading the symbol, epsilon closure included.
+        """
+        transitions = self.transition.get
+        return self.epsilon_closure([target for state in states for target in transitions((state, symbol), [])])
+
+    def lazy_dfa(self):
+        """
+        :return: The LazyDfa of the automaton, kept between the checks.
+        """
+        if self._lazy_dfa is None:
+            self._lazy_dfa = LazyDfa(self)
+        return self._lazy_dfa
+
+    def compile(self):
+        """
+        :return: The CompiledAutomaton of the automaton, built on the first call.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledAutomaton(self)
+        return self._compiled
 
-    
+    def size_report(self):
+        report = self.compile().report
+        return ("{states} states and {transitions} transitions -> {dfa_states} DFA states with the dead state "
+                "-> {minimized_states} states after minimization, {table_entries} table entries").format(**report)
+
+    def check_batch(self, sequences, lengths=None):
+        """
+        :return: Acceptance of every sequence, see CompiledAutomaton.check_batch. The automaton is compiled.
+        """
+        return self.compile().check_batch(sequences, lengths)
+
+    def check_file(self, filename, batch_size=BATCH_SIZE):
+        """
+        Checks the sequences of a file, one per line with comma-separated symbols as the menu reads them, by
+        batches of batch_size sequences.
+        :return: List of booleans, True for every accepted sequence.
+        """
+        compiled = self.compile()
+        accepted = []
+        with open(filename) as file:
+            while True:
+                batch = [line.strip().replace(" ", "").split(",") if line.strip() else []
+                         for line in itertools.islice(file, batch_size)]
+                if not batch:
+                    return accepted
+                accepted.extend(compiled.check_batch(batch))
+
+    def search(self, text, overlapping=False):
+        """
+        :return: Iterator over the (start, end) spans of the substrings of the text accepted by the automaton, see
+                 CompiledAutomaton.search. The automaton is compiled.
+        """
+        return self.compile().search(text, overlapping)
+
+    def matcher(self):
+        """
+        :return: A new Matcher checking a sequence given in chunks.
+        """
+        return Matcher(self)
+
+    def check_sequence(self, sequence):
+        """
+        A deterministic automaton is compiled on the first check, a non-deterministic one is checked through its
+        LazyDfa unless it was compiled, its full subset construction could be much larger.
+        """
+        if self._compiled is not None or self.is_deterministic():
+            return self.compile().check(sequence)
+        return self.lazy_dfa().accepts(sequence)
 
 
 def user_menu(automaton):
     while True:
         print_menu()
-        choice = input("Enter your choice (0-7): ")
+        choice = input("Enter your choice (0-8): ")
         if choice == "0":
             break
         elif choice == "6":
             print(check_sequence(automaton))
+        elif choice == "7":
+            print(automaton.size_report())
+        elif choice == "8":
+            print(search_text(automaton))
         elif choice in MENU_OPTIONS:
             print(getattr(automaton, MENU_OPTIONS[choice]))
         else:
@@ -55,6 +671,11 @@ def check_sequence(automaton):
     return automaton.check_sequence(sequence)
 
 
+def search_text(automaton):
+    text = input("Please enter the text to search: ")
+    return list(automaton.search(text))
+
+
 def print_menu():
     print("\n".join(MENU_OPTIONS.values()))
 
@@ -66,6 +687,8 @@ MENU_OPTIONS = {
     "4": "initial_state",
     "5": "final_states",
     "6": "check_sequence",
+    "7": "size_report",
+    "8": "search",
     "0": "exit"
 }
 
@@ -76,4 +699,5 @@ def start():
     print(f"Finite automaton is deterministic: {automaton.is_deterministic()}")
 
 
-start()
\ No newline at end of file
+if __name__ == "__main__":
+    start()
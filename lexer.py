@@ -0,0 +1,382 @@
+import itertools
+import string
+
+from lab4 import FiniteAutomaton
+
+# characters a token can contain, any other character is a lexical error
+ALPHABET = string.printable
+METACHARACTERS = set('\\|*+?()[].')
+
+
+def escape(text):
+    """
+    :return: Pattern matching exactly the text.
+    """
+    return ''.join('\\' + char if char in METACHARACTERS else char for char in text)
+
+
+class _Nfa:
+    """
+    Thompson automaton: every state has a list of (set of characters, target) edges and a list of epsilon targets.
+    """
+
+    def __init__(self):
+        self.edges = []
+        self.epsilon = []
+
+    def state(self):
+        self.edges.append([])
+        self.epsilon.append([])
+        return len(self.edges) - 1
+
+
+class _PatternCompiler:
+    """
+    Recursive descent over the pattern syntax: alternation '|', concatenation, the postfix operators '*', '+', '?',
+    groups '(...)', classes '[a-z_]' and '[^...]', '.' (any character but a new line) and '\\' escapes.
+    Every method returns a fragment (start, end) of the NFA.
+    """
+
+    def __init__(self, nfa, pattern):
+        self._nfa = nfa
+        self._pattern = pattern
+        self._position = 0
+
+    def compile(self):
+        fragment = self._alternation()
+        if self._position != len(self._pattern):
+            raise ValueError('Unexpected {!r} in pattern {!r}'.format(self._pattern[self._position], self._pattern))
+        return fragment
+
+    def _peek(self):
+        return self._pattern[self._position] if self._position < len(self._pattern) else None
+
+    def _next(self):
+        if self._position >= len(self._pattern):
+            raise ValueError('Unexpected end of pattern {!r}'.format(self._pattern))
+        char = self._pattern[self._position]
+        self._position += 1
+        return char
+
+    def _alternation(self):
+        fragments = [self._concatenation()]
+        while self._peek() == '|':
+            self._position += 1
+            fragments.append(self._concatenation())
+        if len(fragments) == 1:
+            return fragments[0]
+        start, end = self._nfa.state(), self._nfa.state()
+        for fragment_start, fragment_end in fragments:
+            self._nfa.epsilon[start].append(fragment_start)
+            self._nfa.epsilon[fragment_end].append(end)
+        return start, end
+
+    def _concatenation(self):
+        start = end = self._nfa.state()
+        while self._peek() not in (None, '|', ')'):
+            fragment_start, fragment_end = self._repetition()
+            self._nfa.epsilon[end].append(fragment_start)
+            end = fragment_end
+        return start, end
+
+    def _repetition(self):
+        start, end = self._atom()
+        while self._peek() in ('*', '+', '?'):
+            operator = self._next()
+            new_start, new_end = self._nfa.state(), self._nfa.state()
+            self._nfa.epsilon[new_start].append(start)
+            self._nfa.epsilon[end].append(new_end)
+            if operator != '+':
+                self._nfa.epsilon[new_start].append(new_end)
+            if operator != '?':
+                self._nfa.epsilon[end].append(start)
+            start, end = new_start, new_end
+        return start, end
+
+    def _atom(self):
+        char = self._next()
+        if char == '(':
+            fragment = self._alternation()
+            if self._next() != ')':
+                raise ValueError('Missing ) in pattern {!r}'.format(self._pattern))
+            return fragment
+        if char == '[':
+            characters = self._class()
+        elif char == '.':
+            characters = set(ALPHABET) - {'\n'}
+        elif char == '\\':
+            characters = {self._next()}
+        elif char in ('*', '+', '?', ')', '|'):
+            raise ValueError('Unexpected {!r} in pattern {!r}'.format(char, self._pattern))
+        else:
+            characters = {char}
+        start, end = self._nfa.state(), self._nfa.state()
+        self._nfa.edges[start].append((frozenset(characters), end))
+        return start, end
+
+    def _class(self):
+        negated = self._peek() == '^'
+        if negated:
+            self._position += 1
+        characters = set()
+        first = True
+        while first or self._peek() != ']':
+            first = False
+            char = self._next()
+            if char == '\\':
+                char = self._next()
+            if self._peek() == '-' and self._pattern[self._position + 1:self._position + 2] not in ('', ']'):
+                self._position += 1
+                last = self._next()
+                if last == '\\':
+                    last = self._next()
+                characters.update(chr(code) for code in range(ord(char), ord(last) + 1))
+            else:
+                characters.add(char)
+        self._position += 1
+        return set(ALPHABET) - characters if negated else characters
+
+
+class Lexer:
+    def __init__(self, kinds, class_of, table, class_count, accept, start, dead, error=None):
+        """
+        Maximal munch scanner over a dense transition table, see LexerGenerator.
+        :param kinds: token kind of every specification, in priority order
+        :param class_of: character -> column of the table
+        :param table: flat list, table[state * class_count + column] is the next state
+        :param accept: for every state the index in kinds of the token it accepts, -1 if it is not final
+        :param error: kind of a character which starts no token
+        """
+        self.kinds = kinds
+        self._class_of = class_of
+        self._table = table
+        self._class_count = class_count
+        self._accept = accept
+        self._start = start
+        self._dead = dead
+        self._error = error
+
+    def state_count(self):
+        return len(self._accept)
+
+    def tokens(self, text):
+        """
+        Splits the text into the longest tokens, the specification listed first winning a tie.
+        A character which starts no token is returned alone with the error kind, None by default.
+        :return: Iterator over (kind, token, position).
+        """
+        return self.stream((text,))
+
+    def stream(self, chunks):
+        """
+        Splits the text given as an iterable of chunks, see tokens. A token whose scan reaches the end of a chunk
+        without the DFA dying could go on in the next one, so it is kept and scanned again with the next chunk: a
+        token may cross any number of chunks and only the chunk being scanned and that token are held in memory.
+        :return: Iterator over (kind, token, position), position being the offset of the token in the whole text.
+        """
+        class_of = self._class_of.get
+        table = self._table
+        class_count = self._class_count
+        accept = self._accept
+        kinds = self.kinds
+        error = self._error
+        start, dead = self._start, self._dead
+        # text not scanned yet and its offset in the whole text
+        pending = ''
+        offset = 0
+        for chunk in itertools.chain(chunks, [None]):
+            last = chunk is None
+            text = pending + chunk if not last else pending
+            length = len(text)
+            position = 0
+            while position < length:
+                state = start
+                accepted, end = -1, position
+                index = position
+                while index < length:
+                    column = class_of(text[index])
+                    if column is None:
+                        break
+                    state = table[state * class_count + column]
+                    if state == dead:
+                        break
+                    index += 1
+                    if accept[state] >= 0:
+                        accepted, end = accept[state], index
+                if index == length and not last:
+                    break
+                if accepted < 0:
+                    yield error, text[position], offset + position
+                    position += 1
+                else:
+                    yield kinds[accepted], text[position:end], offset + position
+                    position = end
+            pending = text[position:]
+            offset += position
+
+
+class LexerGenerator:
+    def __init__(self, specification):
+        """
+        Builds a minimized DFA recognizing the tokens of the specification:
+            • every pattern becomes a Thompson NFA, the NFAs share the start state
+            • the characters are split into classes of characters used by the same edges, the columns of the table
+            • the subset construction gives a DFA whose final states accept the first specification they contain
+            • the DFA is minimized by refining the partition of its states by the accepted kind
+        :param specification: list of (kind, pattern) in priority order, see _PatternCompiler for the syntax
+        """
+        self._kinds = [kind for kind, _ in specification]
+        nfa = _Nfa()
+        start = nfa.state()
+        accepting = {}
+        for index, (_, pattern) in enumerate(specification):
+            fragment_start, fragment_end = _PatternCompiler(nfa, pattern).compile()
+            nfa.epsilon[start].append(fragment_start)
+            accepting[fragment_end] = index
+        self._nfa = nfa
+        self._nfa_start = start
+        self._nfa_accepting = accepting
+        self._classes, self._class_of = self._character_classes()
+        transitions, accept = self._determinize()
+        self._transitions, self._accept, self._start = self._minimize(transitions, accept)
+
+    def _character_classes(self):
+        """
+        :return: (list with the characters of every class, dictionary character -> class)
+        """
+        signatures = {}
+        for edges in self._nfa.edges:
+            for characters, _ in edges:
+                signatures.setdefault(characters, len(signatures))
+        by_signature = {}
+        for char in ALPHABET:
+            signature = tuple(index for characters, index in signatures.items() if char in characters)
+            if signature:
+                by_signature.setdefault(signature, []).append(char)
+        classes = list(by_signature.values())
+        return classes, {char: column for column, chars in enumerate(classes) for char in chars}
+
+    def _closure(self, states):
+        epsilon = self._nfa.epsilon
+        closure = set(states)
+        stack = list(states)
+        while stack:
+            for target in epsilon[stack.pop()]:
+                if target not in closure:
+                    closure.add(target)
+                    stack.append(target)
+        return frozenset(closure)
+
+    def _determinize(self):
+        """
+        :return: (transitions, accept) of the DFA, transitions[state][column] being a state or -1 for the dead state.
+        """
+        edges = self._nfa.edges
+        columns = [chars[0] for chars in self._classes]
+        start = self._closure([self._nfa_start])
+        states = {start: 0}
+        subsets = [start]
+        transitions = []
+        accept = []
+        for subset in subsets:
+            row = []
+            for char in columns:
+                targets = [target for state in subset for characters, target in edges[state] if char in characters]
+                if not targets:
+                    row.append(-1)
+                    continue
+                target = self._closure(targets)
+                if target not in states:
+                    states[target] = len(subsets)
+                    subsets.append(target)
+                row.append(states[target])
+            transitions.append(row)
+            kinds = [self._nfa_accepting[state] for state in subset if state in self._nfa_accepting]
+            accept.append(min(kinds) if kinds else -1)
+        return transitions, accept
+
+    @staticmethod
+    def _minimize(transitions, accept):
+        """
+        Merges the equivalent states: the states are split by accepted kind, then every block is split by the blocks
+        reached on each column until no block is split. The dead state is added as the last state.
+        :return: (transitions, accept, start) of the minimized DFA.
+        """
+        dead = len(transitions)
+        transitions = transitions + [[dead] * len(transitions[0] if transitions else [])]
+        transitions = [[dead if target == -1 else target for target in row] for row in transitions]
+        accept = accept + [-1]
+        block = accept[:]
+        while True:
+            signatures = {}
+            refined = [signatures.setdefault((block[state],) + tuple(block[target] for target in transitions[state]),
+                                             len(signatures))
+                       for state in range(len(transitions))]
+            if len(signatures) == len(set(block)):
+                break
+            block = refined
+        # renumber the blocks in the order of their first state, the block of the dead state being the last one
+        order = {}
+        for state in range(dead):
+            if block[state] != block[dead]:
+                order.setdefault(block[state], len(order))
+        order[block[dead]] = len(order)
+        minimized = [None] * len(order)
+        minimized_accept = [-1] * len(order)
+        for state in range(len(transitions)):
+            number = order[block[state]]
+            minimized[number] = [order[block[target]] for target in transitions[state]]
+            minimized_accept[number] = accept[state]
+        return minimized, minimized_accept, order[block[0]]
+
+    def dead_state(self):
+        """
+        :return: The state reached by a character which can not continue any token, the last one.
+        """
+        return len(self._transitions) - 1
+
+    def state_count(self):
+        return len(self._transitions)
+
+    def lexer(self, kinds=None):
+        """
+        :param kinds: dictionary kind of the specification -> kind returned by the lexer, e.g. a token code, the key
+                      None giving the kind of a character which starts no token; the kinds are translated here, once,
+                      so the scan returns them as they are
+        :return: Lexer over the dense table of the minimized DFA.
+        """
+        class_count = len(self._classes)
+        table = [target for row in self._transitions for target in row]
+        if kinds is None:
+            return Lexer(self._kinds, self._class_of, table, class_count, self._accept, self._start, self.dead_state())
+        return Lexer([kinds[kind] for kind in self._kinds], self._class_of, table, class_count, self._accept,
+                     self._start, self.dead_state(), kinds.get(None))
+
+    def automaton(self):
+        """
+        :return: The minimized DFA as a FiniteAutomaton over single characters, without its dead state.
+        """
+        dead = self.dead_state()
+        states = ['q{}'.format(state) for state in range(dead)]
+        transition = {}
+        for state in range(dead):
+            for column, target in enumerate(self._transitions[state]):
+                if target != dead:
+                    for char in self._classes[column]:
+                        transition[(states[state], char)] = [states[target]]
+        final_states = [states[state] for state in range(dead) if self._accept[state] >= 0]
+        alphabet = [char for chars in self._classes for char in chars]
+        return FiniteAutomaton.from_definition(states, alphabet, states[self._start], final_states, transition)
+
+
+def lab1_specification(keywords, operators, delimiters):
+    """
+    :return: Specification of the tokens of the lab1 language, the keywords, operators and delimiters being their own
+             kinds so their codes are found directly.
+    """
+    char = r"[a-zA-Z0-9_?!#*./%+=<>;)(}{ ]"
+    specification = [(keyword, escape(keyword)) for keyword in keywords]
+    specification.append(('identifier', r'[a-zA-Z][a-zA-Z0-9_]*'))
+    specification.append(('constant', r"(0|[1-9][0-9]*)(\.[0-9]+)?|'" + char + "'|\"" + char + '+"'))
+    specification.extend((token, escape(token)) for token in operators + delimiters)
+    return specification
@@ -0,0 +1,189 @@
+import argparse
+import concurrent.futures
+import json
+import os
+import time
+
+from EarleyParser import EarleyParser
+from GrammarCache import GrammarCache
+from LRParser import LRParser
+from PrintParser import PrintParser
+from TokenSource import read_tokens
+
+LL1 = 'll1'
+EARLEY = 'earley'
+ENGINES = (LRParser.LALR, LRParser.SLR, LL1, EARLEY)
+
+# parser of the current process, built once per worker by _initialize
+_parser = None
+
+
+def _build_parser(grammar_file, engine, cache_directory):
+    """
+    :return: A parser of the engine for the grammar, its tables read from the cache when they were built before.
+    :raises ValueError: If the engine is LL1 and the grammar, once its left recursion is eliminated, is not LL(1).
+    """
+    cache = GrammarCache(cache_directory)
+    grammar = cache.load_grammar(grammar_file)
+    if engine == EARLEY:
+        return EarleyParser(grammar)
+    if engine == LL1:
+        if grammar.left_recursive_non_terminals():
+            # only the left factored form can be LL(1), the trees still refer to the user's productions
+            grammar = cache.transform(grammar, 'left_recursion_factored', _eliminate_left_recursion_factored)
+        parser = cache.ll1_parser(grammar)
+        if not parser.is_ll1():
+            raise ValueError('The grammar {} is not LL(1), conflicting entries (non-terminal, terminal, productions): '
+                             '{}'.format(grammar_file, parser.conflicts()))
+        return parser
+    return cache.lr_parser(grammar, engine)
+
+
+def _eliminate_left_recursion_factored(grammar):
+    return grammar.eliminate_left_recursion(factored=True)
+
+
+def _initialize(grammar_file, engine, cache_directory):
+    global _parser
+    _parser = _build_parser(grammar_file, engine, cache_directory)
+
+
+def _parse_file(job):
+    """
+    Parses one input file with the parser of the process.
+    :param job: (input file, tree file or None, output format of the tree)
+    :return: Result of the file, see BatchParser.run.
+    """
+    input_file, tree_file, output_format = job
+    start = time.perf_counter()
+    result = {'file': input_file, 'accepted': False, 'index': None, 'tokens': 0, 'tree': None, 'error': None}
+    try:
+        sequence = list(read_tokens(input_file))
+        result['tokens'] = len(sequence)
+        result['accepted'] = _parser.parse(sequence)
+        if not result['accepted']:
+            result['index'] = _parser.getIndex()
+        elif tree_file is not None:
+            PrintParser(_parser.getTree()).printToFile(tree_file, output_format)
+            result['tree'] = tree_file
+    except (OSError, UnicodeDecodeError) as error:
+        result['error'] = str(error)
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+class BatchParser:
+    RESULTS = 'results.jsonl'
+    SUMMARY = 'summary.json'
+
+    def __init__(self, grammar_file, engine=LRParser.LALR, workers=None, cache_directory='__grammarcache__'):
+        """
+        Parses many input files against one grammar in a pool of worker processes.
+        The grammar is loaded and its tables built once, in this process, and stored in the GrammarCache: every
+        worker then builds its parser from the cache, reading the pickled tables instead of computing them, and
+        keeps it for all the files it is given.
+        :param grammar_file: path of the grammar
+        :param engine: one of ENGINES
+        :param workers: number of worker processes, None for one per core, 1 parses in this process
+        :param cache_directory: directory of the GrammarCache shared with the workers
+        :raises ValueError: If the engine is unknown, or is LL1 and the grammar is not LL(1).
+        """
+        if engine not in ENGINES:
+            raise ValueError('Unknown engine: {}'.format(engine))
+        self._grammar_file = grammar_file
+        self._engine = engine
+        self._workers = workers or os.cpu_count() or 1
+        self._cache_directory = cache_directory
+        # builds the cache entries the workers read
+        _build_parser(grammar_file, engine, cache_directory)
+
+    def run(self, input_files, output_directory=None, output_format=PrintParser.TABLE):
+        """
+        Every result is a dictionary with the keys:
+            • file, tokens, seconds: the input file, its number of terminals and the time spent on it
+            • accepted: True if the sequence is accepted, index: the error position if it is not
+            • tree: the file the parse tree was written to, None if no tree was written
+            • error: the message of the error if the file could not be read, None otherwise
+        :param input_files: paths of files with a terminal or a PIF line per line, see TokenSource.read_tokens
+        :param output_directory: directory receiving the parse trees, RESULTS and SUMMARY, None to write nothing
+        :param output_format: format of the trees, see PrintParser.printToFile
+        :return: (list of the results in the order of the input files, summary)
+        """
+        input_files = list(input_files)
+        jobs = [(input_file, None, output_format) for input_file in input_files]
+        if output_directory is not None:
+            os.makedirs(output_directory, exist_ok=True)
+            jobs = [(input_file, tree_file, output_format)
+                    for input_file, tree_file in zip(input_files, self._tree_files(input_files, output_directory))]
+        start = time.perf_counter()
+        if self._workers == 1:
+            _initialize(self._grammar_file, self._engine, self._cache_directory)
+            results = [_parse_file(job) for job in jobs]
+        else:
+            # a few chunks per worker balance the load without a round trip per file
+            chunk_size = max(1, len(jobs) // (self._workers * 4))
+            with concurrent.futures.ProcessPoolExecutor(
+                    self._workers, initializer=_initialize,
+                    initargs=(self._grammar_file, self._engine, self._cache_directory)) as pool:
+                results = list(pool.map(_parse_file, jobs, chunksize=chunk_size))
+        summary = self.summarize(results, time.perf_counter() - start)
+        if output_directory is not None:
+            with open(os.path.join(output_directory, BatchParser.RESULTS), 'w') as file:
+                for result in results:
+                    file.write(json.dumps(result) + '\n')
+            with open(os.path.join(output_directory, BatchParser.SUMMARY), 'w') as file:
+                json.dump(summary, file, indent=2)
+                file.write('\n')
+        return results, summary
+
+    @staticmethod
+    def _tree_files(input_files, output_directory):
+        """
+        :return: Name of the tree file of every input file, made unique when two input files have the same name.
+        """
+        used = set()
+        for input_file in input_files:
+            stem = os.path.splitext(os.path.basename(input_file))[0]
+            name, number = stem, 1
+            while name in used:
+                number += 1
+                name = '{}-{}'.format(stem, number)
+            used.add(name)
+            yield os.path.join(output_directory, name + '.tree')
+
+    def summarize(self, results, seconds):
+        """
+        :param results: results returned by run
+        :param seconds: wall-clock time of the batch
+        :return: Dictionary with the totals of the batch and its throughput.
+        """
+        accepted = sum(1 for result in results if result['accepted'])
+        failed = sum(1 for result in results if result['error'] is not None)
+        tokens = sum(result['tokens'] for result in results)
+        return {'engine': self._engine, 'workers': self._workers, 'files': len(results), 'accepted': accepted,
+                'rejected': len(results) - accepted - failed, 'failed': failed, 'tokens': tokens,
+                'seconds': seconds, 'files_per_second': len(results) / seconds if seconds else 0.0,
+                'tokens_per_second': tokens / seconds if seconds else 0.0}
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Parses many input files against one grammar.')
+    arguments.add_argument('grammar', help='grammar file')
+    arguments.add_argument('output', help='directory receiving the trees and the summary')
+    arguments.add_argument('inputs', nargs='+', help='files with the sequences to parse')
+    arguments.add_argument('--engine', choices=ENGINES, default=LRParser.LALR)
+    arguments.add_argument('--workers', type=int, default=None, help='worker processes, one per core by default')
+    arguments.add_argument('--format', choices=(PrintParser.TABLE, PrintParser.CSV, PrintParser.JSONL,
+                                                PrintParser.BINARY), default=PrintParser.TABLE)
+    options = arguments.parse_args()
+    try:
+        batch = BatchParser(options.grammar, options.engine, options.workers)
+    except ValueError as error:
+        arguments.error(str(error))
+    _, summary = batch.run(options.inputs, options.output, options.format)
+    print('{files} files, {accepted} accepted, {rejected} rejected, {failed} failed in {seconds:.3f}s '
+          '-> {files_per_second:,.1f} files/s'.format(**summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+EPSILON = 'epsilon'
+
+
+class CompiledGrammar:
+    """
+    Indexed form of a ContextFreeGrammar, built once by load_grammar:
+        • every symbol is interned to a small integer: non-terminals get 0 .. non_terminal_count - 1,
+          the terminals (and any undeclared symbol used in a production) get the following ids
+        • right-hand sides are split once into tuples, both of names and of ids, the production
+          A -> epsilon has an empty right-hand side
+        • production numbers index directly into lhs/rhs, so a production is found in O(1)
+    """
+
+    def __init__(self, grammar):
+        """
+        :param grammar: a loaded ContextFreeGrammar
+        """
+        self.symbols = []
+        self.ids = {}
+        for non_terminal in grammar.non_terminals:
+            self._intern(non_terminal)
+        self.non_terminal_count = len(self.symbols)
+        for terminal in grammar.terminals:
+            self._intern(terminal)
+
+        self.non_terminal_set = frozenset(grammar.non_terminals)
+        self.terminal_set = frozenset(grammar.terminals)
+        self.start = self.ids.get(grammar.start_symbol, -1)
+
+        # production numbers start from 1, index 0 is a placeholder
+        production_count = sum(len(productions) for productions in grammar.rules.values())
+        self.lhs = [-1] * (production_count + 1)
+        self.rhs = [()] * (production_count + 1)
+        self.rhs_names = [()] * (production_count + 1)
+        self.productions = [None] * (production_count + 1)
+        self.alternatives = {}
+        for non_terminal, productions in grammar.rules.items():
+            lhs = self._intern(non_terminal)
+            numbers = []
+            for production, number in productions:
+                names = tuple(production.split('$')) if production != EPSILON else ()
+                self.productions[number] = (production, number)
+                self.lhs[number] = lhs
+                self.rhs_names[number] = names
+                self.rhs[number] = tuple(self._intern(name) for name in names)
+                numbers.append(number)
+            self.alternatives[lhs] = tuple(numbers)
+        # the end of the input gets the first id not used by a symbol
+        self.end = len(self.symbols)
+        self._nullable = None
+        self._first = None
+        self._follow = None
+
+    def _intern(self, name):
+        """
+        :param name: symbol name
+        :return: id of the symbol, a new one is assigned if the symbol was not seen before
+        """
+        symbol_id = self.ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.ids[name] = symbol_id
+            self.symbols.append(name)
+        return symbol_id
+
+    def nullable(self):
+        """
+        :return: Set with the ids of the non-terminals deriving the empty sequence.
+        """
+        if self._nullable is None:
+            nullable = set()
+            changed = True
+            while changed:
+                changed = False
+                for number in range(1, len(self.lhs)):
+                    if self.lhs[number] not in nullable and all(symbol in nullable for symbol in self.rhs[number]):
+                        nullable.add(self.lhs[number])
+                        changed = True
+            self._nullable = nullable
+        return self._nullable
+
+    def first_of_sequence(self, symbols):
+        """
+        :param symbols: sequence of symbol ids
+        :return: (FIRST set of the sequence as terminal ids, True if the sequence derives the empty sequence)
+        """
+        first_sets = self.first_sets()
+        nullable = self.nullable()
+        first = set()
+        for symbol in symbols:
+            if symbol < self.non_terminal_count:
+                first |= first_sets[symbol]
+                if symbol not in nullable:
+                    return first, False
+            else:
+                first.add(symbol)
+                return first, False
+        return first, True
+
+    def first_sets(self):
+        """
+        :return: Dictionary non-terminal id -> set with the terminal ids of its FIRST set, epsilon is not included.
+        """
+        if self._first is None:
+            nullable = self.nullable()
+            first = {non_terminal: set() for non_terminal in range(self.non_terminal_count)}
+            changed = True
+            while changed:
+                changed = False
+                for number in range(1, len(self.lhs)):
+                    lhs = first[self.lhs[number]]
+                    for symbol in self.rhs[number]:
+                        added = first[symbol] if symbol < self.non_terminal_count else {symbol}
+                        if not added <= lhs:
+                            lhs |= added
+                            changed = True
+                        if symbol not in nullable:
+                            break
+            self._first = first
+        return self._first
+
+    def follow_sets(self):
+        """
+        :return: Dictionary non-terminal id -> set with the terminal ids of its FOLLOW set, end included.
+        """
+        if self._follow is None:
+            follow = {non_terminal: set() for non_terminal in range(self.non_terminal_count)}
+            if self.start >= 0:
+                follow[self.start].add(self.end)
+            changed = True
+            while changed:
+                changed = False
+                for number in range(1, len(self.lhs)):
+                    rhs = self.rhs[number]
+                    for position, symbol in enumerate(rhs):
+                        if symbol >= self.non_terminal_count:
+                            continue
+                        first, nullable = self.first_of_sequence(rhs[position + 1:])
+                        if nullable:
+                            first |= follow[self.lhs[number]]
+                        if not first <= follow[symbol]:
+                            follow[symbol] |= first
+                            changed = True
+            self._follow = follow
+        return self._follow
+
+    def is_non_terminal_id(self, symbol_id):
+        """
+        :param symbol_id: id of a symbol
+        :return: True if the symbol is a declared non-terminal
+        """
+        return symbol_id < self.non_terminal_count
+
+    def production_count(self):
+        """
+        :return: Number of productions, they are numbered from 1 to production_count.
+        """
+        return len(self.lhs) - 1
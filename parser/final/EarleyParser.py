@@ -0,0 +1,265 @@
+from ParseTree import ParseTree
+
+
+class EarleyParser:
+    def __init__(self, grammar, keep_forest=False):
+        """
+        Earley parser for any context-free grammar, ambiguous or left recursive ones included.
+        It takes O(n^3) time in the worst case, O(n^2) for unambiguous grammars and O(n) for the LR(k) grammars.
+        Right recursion is kept linear by Leo's deterministic reduction paths: when the completed non-terminal has a
+        single parent whose dot is before its last symbol, only the topmost item of the chain of completions is added
+        and the items skipped are rebuilt when a tree goes through them. With keep_forest every item is added.
+        The empty productions are handled as in Aycock and Horspool: predicting a nullable non-terminal also
+        moves the dot over it.
+        The grammar is augmented with the production 0: S' -> S.
+        An item is (production number, position of the dot, origin) and chart[k] holds the items ending at k.
+        Every item remembers how it was first obtained, (predecessor item, its position, child), which gives one parse
+        tree. With keep_forest every way of obtaining an item is kept, the items and their links forming a binarized
+        shared packed forest of all the parse trees.
+        :param grammar: a loaded ContextFreeGrammar
+        :param keep_forest: keep all the derivations, not only the first one
+        """
+        self._grammar = grammar
+        self._compiled = grammar.compiled
+        self._keep_forest = keep_forest
+        self._lhs = [-1] + self._compiled.lhs[1:]
+        self._rhs = [(self._compiled.start,)] + self._compiled.rhs[1:]
+        self._nullable = self._compiled.nullable()
+        self._empty_production = self._empty_productions()
+        self._chart = []
+        self._links = []
+        self._waiting = []
+        self._tokens = []
+        self._state = "q"
+        self._index = 0
+        self._working_stack = []
+        self._tree = []
+
+    def _empty_productions(self):
+        """
+        :return: Dictionary nullable non-terminal -> production deriving the empty sequence through non-terminals
+                 found nullable before it, so the empty subtrees are finite.
+        """
+        compiled = self._compiled
+        productions = {}
+        changed = True
+        while changed:
+            changed = False
+            for number in range(1, compiled.production_count() + 1):
+                lhs = compiled.lhs[number]
+                if lhs not in productions and all(symbol in productions for symbol in compiled.rhs[number]):
+                    productions[lhs] = number
+                    changed = True
+        return productions
+
+    def getState(self):
+        return self._state
+
+    def getIndex(self):
+        return self._index
+
+    def getWorkingStack(self):
+        return self._working_stack
+
+    def getTree(self):
+        return self._tree
+
+    def item_count(self):
+        """
+        :return: Number of items in the chart of the last parse.
+        """
+        return sum(len(items) for items in self._chart)
+
+    def parse(self, sequence):
+        """
+        Recognizes the sequence and, if it is accepted, extracts the first parse tree found.
+        The state becomes 'f' if the sequence is accepted and 'e' otherwise, the index being the position of the
+        first token which can not continue any derivation.
+        :param sequence: iterable of terminal names
+        :return: True if the sequence is accepted, False otherwise.
+        """
+        compiled = self._compiled
+        ids = compiled.ids
+        non_terminal_count = compiled.non_terminal_count
+        alternatives = compiled.alternatives
+        nullable = self._nullable
+        lhs_of = self._lhs
+        rhs_of = self._rhs
+        keep_forest = self._keep_forest
+        tokens = [ids.get(token, -1) for token in sequence]
+        self._tokens = tokens
+        length = len(tokens)
+
+        # links[k]: item -> (predecessor item, position of the predecessor, child), a list of them with keep_forest
+        # a child is a terminal id, ('empty', non-terminal) or (production, origin, end) for a completed item
+        chart = [[] for _ in range(length + 1)]
+        links = [{} for _ in range(length + 1)]
+        waiting = [{} for _ in range(length + 1)]
+        # transitive[j]: non-terminal -> topmost item completed when the non-terminal started at j is completed,
+        # None if the reduction path is not deterministic
+        transitive = [{} for _ in range(length + 1)]
+        self._chart = chart
+        self._links = links
+        self._waiting = waiting
+
+        def topmost(position, symbol):
+            chain = []
+            top = None
+            while True:
+                known = transitive[position].get(symbol, chain)
+                if known is not chain:
+                    top = known if known is not None else top
+                    break
+                parents = waiting[position].get(symbol, ())
+                if len(parents) != 1 or parents[0][1] + 1 != len(rhs_of[parents[0][0]]):
+                    transitive[position][symbol] = None
+                    break
+                chain.append((position, symbol))
+                production, dot, origin = parents[0]
+                top = (production, dot + 1, origin)
+                position, symbol = origin, lhs_of[production]
+            for position, symbol in chain:
+                transitive[position][symbol] = top
+            return top
+
+        def add(position, item, link):
+            known = links[position].get(item)
+            if known is None:
+                links[position][item] = [link] if keep_forest else link
+                chart[position].append(item)
+            elif keep_forest and link not in known:
+                known.append(link)
+
+        add(0, (0, 0, 0), None)
+        reached = 0
+        for position in range(length + 1):
+            items = chart[position]
+            if not items:
+                break
+            reached = position
+            token = tokens[position] if position < length else None
+            predicted = set()
+            waiting_here = waiting[position]
+            index = 0
+            while index < len(items):
+                item = items[index]
+                index += 1
+                production, dot, origin = item
+                rhs = rhs_of[production]
+                if dot < len(rhs):
+                    symbol = rhs[dot]
+                    if symbol < non_terminal_count:
+                        waiting_here.setdefault(symbol, []).append(item)
+                        if symbol not in predicted:
+                            predicted.add(symbol)
+                            for number in alternatives.get(symbol, ()):
+                                add(position, (number, 0, position), None)
+                        if symbol in nullable:
+                            add(position, (production, dot + 1, origin), (item, position, ('empty', symbol)))
+                    elif symbol == token:
+                        add(position + 1, (production, dot + 1, origin), (item, position, symbol))
+                elif origin != position:
+                    # an empty completion was already taken into account when the non-terminal was predicted
+                    completed = (production, origin, position)
+                    lhs = lhs_of[production]
+                    top = None if keep_forest else topmost(origin, lhs)
+                    if top is not None:
+                        add(position, top, ('leo', origin, lhs, completed))
+                        continue
+                    for parent in waiting[origin].get(lhs, ()):
+                        add(position, (parent[0], parent[1] + 1, parent[2]), (parent, origin, completed))
+
+        accepted = (0, 1, 0) in links[length]
+        self._index = length if accepted else reached
+        if not accepted:
+            self._state = "e"
+            self._working_stack = []
+            self._tree = []
+            return False
+        self._state = "f"
+        self._tree, self._working_stack = ParseTree.flatten(self._build_tree(length))
+        return True
+
+    def _first_link(self, position, item):
+        link = self._links[position][item]
+        if self._keep_forest:
+            return link[0]
+        return self._resolve_leo(position, item, link) if link[0] == 'leo' else link
+
+    def _resolve_leo(self, end, item, link):
+        """
+        Adds the links of the items skipped on a deterministic reduction path, from the completed item to the top.
+        :return: The link of the topmost item, (predecessor item, its position, child).
+        """
+        _, position, symbol, child = link
+        links = self._links[end]
+        while True:
+            parent = self._waiting[position][symbol][0]
+            completed = (parent[0], parent[1] + 1, parent[2])
+            resolved = (parent, position, child)
+            if completed == item:
+                links[item] = resolved
+                return resolved
+            links.setdefault(completed, resolved)
+            child = (parent[0], parent[2], end)
+            position, symbol = parent[2], self._lhs[parent[0]]
+
+    def _build_tree(self, length):
+        """
+        Follows the first link of every item, the links always point to items created before, so the tree is finite.
+        :return: Root of the parse tree as nested nodes, see ParseTree.
+        """
+        symbols = self._compiled.symbols
+        rhs_of = self._rhs
+        lhs_of = self._lhs
+        root = [None]
+        # tasks of (child, list receiving the node, slot in the list)
+        tasks = [(self._first_link(length, (0, 1, 0))[2], root, 0)]
+        while tasks:
+            child, target, slot = tasks.pop()
+            if isinstance(child, int):
+                target[slot] = symbols[child]
+                continue
+            if child[0] == 'empty':
+                production = self._empty_production[child[1]]
+                children = [None] * len(rhs_of[production])
+                for position, symbol in enumerate(rhs_of[production]):
+                    tasks.append((('empty', symbol), children, position))
+            else:
+                production, origin, end = child
+                children = [None] * len(rhs_of[production])
+                item = (production, len(children), origin)
+                position = end
+                while item[1] > 0:
+                    predecessor, position, grandchild = self._first_link(position, item)
+                    tasks.append((grandchild, children, item[1] - 1))
+                    item = predecessor
+            target[slot] = (symbols[lhs_of[production]], production, children)
+        return root[0]
+
+    def forest(self):
+        """
+        Shared packed forest of the last parse, only available when the parser keeps the forest.
+        :return: Dictionary (production, dot, origin, end) -> list of (predecessor, child), the predecessor being
+                 (production, dot - 1, origin, position) and the child a terminal name, ('empty', non_terminal) or
+                 (non_terminal, production, origin, end) for the completed item of a non-terminal.
+        """
+        if not self._keep_forest:
+            raise ValueError('The parser was created without keep_forest')
+        symbols = self._compiled.symbols
+        forest = {}
+        for end, links in enumerate(self._links):
+            for (production, dot, origin), alternatives in links.items():
+                if dot == 0:
+                    continue
+                packed = []
+                for predecessor, position, child in alternatives:
+                    if isinstance(child, int):
+                        child = symbols[child]
+                    elif child[0] == 'empty':
+                        child = ('empty', symbols[child[1]])
+                    else:
+                        child = (symbols[self._lhs[child[0]]],) + child
+                    packed.append(((predecessor[0], predecessor[1], predecessor[2], position), child))
+                forest[(production, dot, origin, end)] = packed
+        return forest
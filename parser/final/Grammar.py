@@ -1,9 +1,20 @@
+import hashlib
+
+from CompiledGrammar import CompiledGrammar
+from LeftRecursion import LeftRecursionEliminator
+
+
 class ContextFreeGrammar:
     def __init__(self):
         self.non_terminals = []
         self.terminals = []
         self.rules = {}
         self.start_symbol = None
+        self.compiled = None
+        # set on grammars produced by a transformation, e.g. eliminate_left_recursion
+        self.transformation = None
+        # sha-256 of the grammar file, set by load_grammar, it keys the entries of a GrammarCache
+        self.digest = None
 
     def terminals_list(self):
         """
@@ -45,25 +56,99 @@ class ContextFreeGrammar:
         :param production_number: The production number to retrieve.
         :return: Specific production rule if found, None otherwise.
         """
-        for production in self.rules[non_terminal]:
-            if production[1] == production_number:
-                return production
+        compiled = self.compiled
+        if 0 < production_number < len(compiled.lhs) and \
+                compiled.symbols[compiled.lhs[production_number]] == non_terminal:
+            return compiled.productions[production_number]
+        return None
+
+    def production_symbols(self, production_number):
+        """
+        :param production_number: The production number.
+        :return: Tuple with the symbols of the right-hand side of the production.
+        """
+        return self.compiled.rhs_names[production_number]
+
+    def is_terminal(self, symbol):
+        """
+        :param symbol: Symbol to check.
+        :return: True if the symbol is a declared terminal.
+        """
+        return symbol in self.compiled.terminal_set
+
+    def is_non_terminal(self, symbol):
+        """
+        :param symbol: Symbol to check.
+        :return: True if the symbol is a declared non-terminal.
+        """
+        return symbol in self.compiled.non_terminal_set
+
+    def compile(self):
+        """
+        Builds the indexed representation used by the parsers, it has to be called again if the grammar is changed.
+        :return: The CompiledGrammar.
+        """
+        self.compiled = CompiledGrammar(self)
+        return self.compiled
+
+    def left_recursive_non_terminals(self):
+        """
+        :return: Set of the non-terminals which are directly or indirectly left recursive.
+        """
+        return LeftRecursionEliminator.left_recursive_non_terminals(self)
+
+    def eliminate_left_recursion(self, factored=False):
+        """
+        Rewrites the grammar into an equivalent one without left recursion, the current grammar is not changed.
+        :param factored: True to rewrite A -> A$α | β as A -> β$A' and A' -> α$A' | epsilon, the form an LL1Parser
+                         can use, instead of A -> β | β$A' and A' -> α | α$A'
+        :return: The new ContextFreeGrammar.
+        :raises ValueError: If a left recursive non-terminal has no production ending the recursion.
+        """
+        return LeftRecursionEliminator(self, factored).eliminate()
+
+    def original_grammar(self):
+        """
+        :return: The grammar given by the user, before any transformation.
+        """
+        return self.transformation.source if self.transformation is not None else self
+
+    def original_derivation(self, working_stack):
+        """
+        :param working_stack: working stack of a successful parse with this grammar
+        :return: The working stack expressed with the productions of the user's grammar.
+        """
+        if self.transformation is None:
+            return working_stack
+        return self.transformation.original_derivation(working_stack)
 
     def load_grammar(self, file_path):
         """
         :param file_path: Path to the file containing the grammar.
         :raises ValueError: If the grammar is not a valid context-free grammar.
         """
-        with open(file_path, 'r') as file:
-            self.non_terminals = self._parse_line(file.readline())
-            self.terminals = self._parse_line(file.readline())
-            self.start_symbol = file.readline().split('=')[1].strip()
-            file.readline()
-            prod_rules = [line.strip() for line in file]
-            self.rules = self._interpret_rules(prod_rules)
+        with open(file_path, 'rb') as file:
+            content = file.read()
+        lines = iter(content.decode().splitlines())
+        self.non_terminals = self._parse_line(next(lines))
+        self.terminals = self._parse_line(next(lines))
+        self.start_symbol = next(lines).split('=')[1].strip()
+        next(lines)
+        prod_rules = [line.strip() for line in lines]
+        self.rules = self._interpret_rules(prod_rules)
+
+        if not self._is_valid_cfg(prod_rules):
+            raise ValueError('The provided grammar is not a valid CFG')
+        self.digest = self.file_digest(content)
+        self.compile()
 
-            if not self._is_valid_cfg(prod_rules):
-                raise ValueError('The provided grammar is not a valid CFG')
+    @staticmethod
+    def file_digest(content):
+        """
+        :param content: bytes of a grammar file
+        :return: Hexadecimal sha-256 of the content.
+        """
+        return hashlib.sha256(content).hexdigest()
 
     def display_non_terminals(self):
         """
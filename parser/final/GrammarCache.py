@@ -0,0 +1,176 @@
+import glob
+import os
+import pickle
+import re
+import tempfile
+
+from Grammar import ContextFreeGrammar
+from LL1Parser import LL1Parser
+from LRParser import LRParser
+
+MAGIC = 'lftc-grammar-cache'
+# what follows the name of the grammar file in the name of an entry
+ENTRY = re.compile(r'([0-9a-f]{16})-[a-z0-9_]+\.pickle')
+
+
+class GrammarCache:
+    # bumped whenever the pickled classes or the table layouts change, older entries are then rebuilt
+    VERSION = 2
+
+    def __init__(self, directory='__grammarcache__'):
+        """
+        On-disk cache of loaded grammars and of the tables built from them.
+        An entry is keyed by the sha-256 of the grammar file and by VERSION, so a changed grammar file or a new
+        version of the engines never reads a stale entry. Every entry is a file holding a pickled header
+        (MAGIC, VERSION, digest, name, source path, source digest) followed by the pickled value, the source being
+        the grammar file the entry comes from: the header is checked before the value is loaded, and an entry which
+        can not be read is built again and overwritten.
+        The entries of a grammar file are named after the file and a hash of its absolute path, so grammar files
+        with the same name in different directories do not share entries.
+        The entries are loaded lazily, the tables of an engine only when a parser of that engine is asked for.
+        Writing an entry replaces the file atomically, several processes can share the directory.
+        :param directory: directory of the cache files, created when the first entry is written
+        """
+        self._directory = directory
+        # digest -> (stem, absolute path, digest) of the grammar file it comes from, the entries of a file start
+        # with its stem
+        self._origins = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load_grammar(self, file_path):
+        """
+        :param file_path: Path to the file containing the grammar.
+        :return: The loaded ContextFreeGrammar, read from the cache if the file did not change since it was stored.
+        :raises ValueError: If the grammar is not a valid context-free grammar.
+        """
+        with open(file_path, 'rb') as file:
+            digest = ContextFreeGrammar.file_digest(file.read())
+        source = os.path.abspath(file_path)
+        stem = '{}-{}'.format(os.path.splitext(os.path.basename(file_path))[0],
+                              ContextFreeGrammar.file_digest(source.encode())[:8])
+        origin = self._origins[digest] = (stem, source, digest)
+        grammar = self._read(origin, digest, 'grammar')
+        if grammar is not None:
+            return grammar
+        self._invalidate(origin)
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar(file_path)
+        # the sets used by the table-driven engines are computed once and stored with the grammar
+        grammar.compiled.follow_sets()
+        self._write(origin, digest, 'grammar', grammar)
+        return grammar
+
+    def get(self, grammar, name, build):
+        """
+        :param grammar: a ContextFreeGrammar loaded from a file or obtained from the cache
+        :param name: name of the value among the values cached for the grammar
+        :param build: function without parameters computing the value on a miss
+        :return: The cached value, or the one built and stored if it was not cached.
+        """
+        digest = grammar.digest
+        if digest is None:
+            return build()
+        origin = self._origin(digest)
+        value = self._read(origin, digest, name)
+        if value is None:
+            value = build()
+            self._write(origin, digest, name, value)
+        return value
+
+    def transform(self, grammar, name, transformation):
+        """
+        Caches a grammar derived from another one, the derived grammar gets its own digest so its tables are cached.
+        :param grammar: a ContextFreeGrammar loaded from a file or obtained from the cache
+        :param name: name of the transformation, e.g. 'left_recursion'
+        :param transformation: function receiving the grammar and returning the derived ContextFreeGrammar
+        :return: The derived ContextFreeGrammar.
+        """
+        def build():
+            derived = transformation(grammar)
+            if grammar.digest is not None:
+                derived.digest = ContextFreeGrammar.file_digest((grammar.digest + name).encode())
+            derived.compiled.follow_sets()
+            return derived
+        derived = self.get(grammar, name, build)
+        if derived.digest is not None:
+            self._origins[derived.digest] = self._origin(grammar.digest)
+        return derived
+
+    def ll1_parser(self, grammar):
+        """
+        :param grammar: a ContextFreeGrammar loaded from a file or obtained from the cache
+        :return: LL1Parser using the cached table.
+        """
+        tables = self.get(grammar, 'll1', lambda: LL1Parser(grammar).export_tables())
+        return LL1Parser(grammar, tables=tables)
+
+    def lr_parser(self, grammar, method=LRParser.LALR):
+        """
+        :param grammar: a ContextFreeGrammar loaded from a file or obtained from the cache
+        :param method: LRParser.SLR or LRParser.LALR
+        :return: LRParser using the cached tables.
+        """
+        tables = self.get(grammar, method, lambda: LRParser(grammar, method).export_tables())
+        return LRParser(grammar, method, tables=tables)
+
+    def _origin(self, digest):
+        """
+        :return: (stem, absolute path, digest) of the grammar file of the digest, a grammar not loaded by the cache
+                 being its own source.
+        """
+        return self._origins.get(digest, (digest[:16], None, digest))
+
+    def _path(self, stem, digest, name):
+        return os.path.join(self._directory, '{}-{}-{}.pickle'.format(stem, digest[:16], name))
+
+    @staticmethod
+    def _header(origin, digest, name):
+        return MAGIC, GrammarCache.VERSION, digest, name, origin[1], origin[2]
+
+    def _read(self, origin, digest, name):
+        """
+        :return: The value of the entry, None if it is missing, stale or damaged.
+        """
+        try:
+            with open(self._path(origin[0], digest, name), 'rb') as file:
+                if pickle.load(file) == self._header(origin, digest, name):
+                    self.hits += 1
+                    return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, TypeError):
+            pass
+        self.misses += 1
+        return None
+
+    def _write(self, origin, digest, name, value):
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(origin[0], digest, name)
+        descriptor, temporary = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                pickle.dump(self._header(origin, digest, name), file, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _invalidate(self, origin):
+        """
+        Removes the entries of an older version of the grammar file, or of an older VERSION, they can never be read
+        again. Only the entries whose header names the same grammar file are removed, the entries of the current
+        version of the file (e.g. its tables when only the grammar entry is missing) are kept.
+        """
+        stem, source, digest = origin
+        pattern = os.path.join(glob.escape(self._directory), '{}-*.pickle'.format(glob.escape(stem)))
+        for path in glob.glob(pattern):
+            if ENTRY.fullmatch(os.path.basename(path)[len(stem) + 1:]) is None:
+                continue
+            try:
+                with open(path, 'rb') as file:
+                    header = pickle.load(file)
+                if (isinstance(header, tuple) and len(header) == 6 and header[0] == MAGIC and header[4] == source
+                        and (header[1] != GrammarCache.VERSION or header[5] != digest)):
+                    os.unlink(path)
+            except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError, TypeError):
+                pass
@@ -0,0 +1,178 @@
+from CompiledGrammar import EPSILON
+from ParseTree import ParseTree
+from TreeStore import TreeStore
+
+END_MARKER = '$'
+
+
+class LL1Parser:
+    def __init__(self, grammar, tables=None):
+        """
+        Predictive parser driven by the LL(1) table of the grammar.
+        first: FIRST set of every non-terminal (terminal ids), the nullable non-terminals are kept apart
+        follow: FOLLOW set of every non-terminal (terminal ids, end of input included)
+        table: for every non-terminal a dictionary terminal id -> production number
+        conflicts: list of (non_terminal, terminal, production numbers) for the table entries with several productions
+        :param grammar: a loaded ContextFreeGrammar
+        :param tables: tables returned by export_tables for the same grammar, they are not built again
+        """
+        self._grammar = grammar
+        self._compiled = grammar.compiled
+        self._end = self._compiled.end
+        self._nullable = self._compiled.nullable()
+        self._first = self._compiled.first_sets()
+        self._follow = self._compiled.follow_sets()
+        if tables is not None:
+            self._table, self._conflicts = tables
+        else:
+            self._table = {}
+            self._conflicts = []
+            self._build_table()
+        self._state = "q"
+        self._index = 0
+        self._working_stack = []
+        self._tree = []
+
+    def _build_table(self):
+        compiled = self._compiled
+        for number in range(1, compiled.production_count() + 1):
+            lhs = compiled.lhs[number]
+            first, nullable = compiled.first_of_sequence(compiled.rhs[number])
+            if nullable:
+                first = first | self._follow[lhs]
+            row = self._table.setdefault(lhs, {})
+            for terminal in first:
+                if terminal in row and row[terminal] != number:
+                    self._add_conflict(lhs, terminal, row[terminal], number)
+                else:
+                    row[terminal] = number
+
+    def export_tables(self):
+        """
+        :return: The parse table and the conflicts, to be given back to the constructor, e.g. by a GrammarCache.
+        """
+        return self._table, self._conflicts
+
+    def _add_conflict(self, lhs, terminal, used, other):
+        non_terminal, terminal = self._name(lhs), self._name(terminal)
+        for conflict in self._conflicts:
+            if conflict[0] == non_terminal and conflict[1] == terminal:
+                if other not in conflict[2]:
+                    conflict[2].append(other)
+                return
+        self._conflicts.append((non_terminal, terminal, [used, other]))
+
+    def _name(self, symbol):
+        return END_MARKER if symbol == self._end else self._compiled.symbols[symbol]
+
+    def first(self, symbol):
+        """
+        :param symbol: name of a non-terminal
+        :return: Set with the terminals from FIRST(symbol), epsilon included if the non-terminal is nullable.
+        """
+        symbol = self._compiled.ids[symbol]
+        names = {self._name(terminal) for terminal in self._first[symbol]}
+        if symbol in self._nullable:
+            names.add(EPSILON)
+        return names
+
+    def follow(self, symbol):
+        """
+        :param symbol: name of a non-terminal
+        :return: Set with the terminals from FOLLOW(symbol), END_MARKER standing for the end of the input.
+        """
+        return {self._name(terminal) for terminal in self._follow[self._compiled.ids[symbol]]}
+
+    def table(self):
+        """
+        :return: Dictionary (non_terminal, terminal) -> production number, the first production added wins a conflict.
+        """
+        return {(self._name(lhs), self._name(terminal)): number
+                for lhs, row in self._table.items() for terminal, number in row.items()}
+
+    def conflicts(self):
+        """
+        :return: List of (non_terminal, terminal, production numbers) for every conflicting table entry.
+        """
+        return self._conflicts
+
+    def is_ll1(self):
+        return not self._conflicts
+
+    def getState(self):
+        return self._state
+
+    def getIndex(self):
+        return self._index
+
+    def getWorkingStack(self):
+        return self._working_stack
+
+    def getTree(self):
+        return self._tree
+
+    def parse(self, sequence):
+        """
+        Parses the sequence of terminals in one pass, the tree is built while the productions are applied.
+        The state becomes 'f' if the sequence is accepted and 'e' otherwise, the index being the error position.
+        The working stack holds the same leftmost derivation as the descendent recursive Parser:
+        (non_terminal, production number) for a non-terminal and the terminal itself for a terminal.
+        :param sequence: iterable of terminal names
+        :return: True if the sequence is accepted, False otherwise.
+        """
+        compiled = self._compiled
+        ids = compiled.ids
+        non_terminal_count = compiled.non_terminal_count
+        rhs = compiled.rhs
+        symbols = compiled.symbols
+        table = self._table
+        end = self._end
+        tokens = [ids.get(token, -1) for token in sequence]
+        tokens.append(end)
+
+        tree = TreeStore()
+        siblings = tree.siblings
+        last_child = []
+        derivation = []
+        # stack of (symbol id, father index), its head at the end
+        stack = [(compiled.start, -1)]
+        index = 0
+        while stack:
+            symbol, father = stack.pop()
+            token = tokens[index]
+            if symbol < non_terminal_count:
+                number = table.get(symbol, {}).get(token)
+                if number is None:
+                    # kept on the stack, so the input is rejected even if it was the last symbol
+                    stack.append((symbol, father))
+                    break
+                derivation.append((symbols[symbol], number))
+            elif symbol == token:
+                derivation.append(symbols[symbol])
+                number = -1
+                index += 1
+            else:
+                stack.append((symbol, father))
+                break
+            node = tree.append(symbols[symbol], father, number)
+            last_child.append(-1)
+            if father != -1:
+                if last_child[father] != -1:
+                    siblings[last_child[father]] = node
+                last_child[father] = node
+            if number != -1:
+                stack.extend((child, node) for child in reversed(rhs[number]))
+
+        self._index = index
+        self._working_stack = derivation
+        if stack or tokens[index] != end:
+            self._state = "e"
+            self._tree = []
+            return False
+        self._state = "f"
+        self._tree = tree
+        if self._grammar.transformation is not None:
+            # the tree refers to the user's productions, as the one of the descendent recursive Parser
+            self._tree = ParseTree.from_derivation(self._grammar.original_derivation(derivation),
+                                                   self._grammar.original_grammar())
+        return True
@@ -0,0 +1,293 @@
+from ParseTree import ParseTree
+
+END_MARKER = '$'
+
+
+class LRParser:
+    SLR = 'slr'
+    LALR = 'lalr'
+
+    def __init__(self, grammar, method=LALR, tables=None):
+        """
+        Shift-reduce parser driven by an SLR(1) or LALR(1) table built from the canonical LR(0) collection.
+        The grammar is augmented with the production 0: S' -> S.
+        An item is a pair (production number, position of the dot) and a state is identified by its kernel items.
+        action: for every state a dictionary terminal id -> code, code >= 0 = shift to that state,
+                code < 0 = reduce with production ~code, ~code == 0 = accept
+        goto: for every state a dictionary symbol id -> state reached after that symbol
+        conflicts: list of (state, terminal, kind, actions), the shift wins a shift/reduce conflict and
+                   the production declared first wins a reduce/reduce conflict
+        :param grammar: a loaded ContextFreeGrammar
+        :param method: LRParser.SLR or LRParser.LALR
+        :param tables: tables returned by export_tables for the same grammar and method, they are not built again
+        """
+        if method not in (LRParser.SLR, LRParser.LALR):
+            raise ValueError('Unknown LR method: {}'.format(method))
+        self._grammar = grammar
+        self._method = method
+        compiled = grammar.compiled
+        self._compiled = compiled
+        self._end = compiled.end
+        # the lookahead propagated by the LALR construction, it never appears in the input
+        self._propagate = compiled.end + 1
+        self._lhs = [-1] + compiled.lhs[1:]
+        self._rhs = [(compiled.start,)] + compiled.rhs[1:]
+
+        if tables is not None:
+            self._kernels, self._goto, self._action, self._conflicts = tables
+        else:
+            self._kernels = []
+            self._goto = []
+            self._build_lr0()
+            if method == LRParser.SLR:
+                reductions = self._slr_reductions()
+            else:
+                reductions = self._lalr_reductions()
+            self._action = []
+            self._conflicts = []
+            self._build_action(reductions)
+
+        self._state = "q"
+        self._index = 0
+        self._working_stack = []
+        self._tree = []
+
+    def export_tables(self):
+        """
+        :return: The LR(0) states, the goto and action tables and the conflicts, to be given back to the constructor,
+                 e.g. by a GrammarCache.
+        """
+        return self._kernels, self._goto, self._action, self._conflicts
+
+    def _closure(self, kernel):
+        """
+        :param kernel: iterable of LR(0) items
+        :return: List with the items of the LR(0) closure of the kernel.
+        """
+        rhs_of = self._rhs
+        alternatives = self._compiled.alternatives
+        non_terminal_count = self._compiled.non_terminal_count
+        items = list(kernel)
+        predicted = set()
+        for production, dot in items:
+            rhs = rhs_of[production]
+            if dot < len(rhs):
+                symbol = rhs[dot]
+                if symbol < non_terminal_count and symbol not in predicted:
+                    predicted.add(symbol)
+                    items.extend((number, 0) for number in alternatives.get(symbol, ()))
+        return items
+
+    def _build_lr0(self):
+        rhs_of = self._rhs
+        start = ((0, 0),)
+        states = {start: 0}
+        self._kernels.append(start)
+        state = 0
+        while state < len(self._kernels):
+            transitions = {}
+            for production, dot in self._closure(self._kernels[state]):
+                rhs = rhs_of[production]
+                if dot < len(rhs):
+                    transitions.setdefault(rhs[dot], []).append((production, dot + 1))
+            goto = {}
+            for symbol, kernel in transitions.items():
+                kernel = tuple(sorted(set(kernel)))
+                target = states.get(kernel)
+                if target is None:
+                    target = len(self._kernels)
+                    states[kernel] = target
+                    self._kernels.append(kernel)
+                goto[symbol] = target
+            self._goto.append(goto)
+            state += 1
+
+    def _slr_reductions(self):
+        """
+        :return: For every state a list of (production, lookahead set) for its completed items.
+        """
+        follow = self._compiled.follow_sets()
+        reductions = []
+        for kernel in self._kernels:
+            completed = []
+            for production, dot in self._closure(kernel):
+                if dot == len(self._rhs[production]):
+                    lookaheads = {self._end} if production == 0 else follow[self._lhs[production]]
+                    completed.append((production, lookaheads))
+            reductions.append(completed)
+        return reductions
+
+    def _closure_lr1(self, items):
+        """
+        :param items: dictionary LR(0) item -> set of lookaheads
+        :return: Dictionary with the LR(1) closure of the items, an item keeping the union of its lookaheads.
+        """
+        compiled = self._compiled
+        rhs_of = self._rhs
+        non_terminal_count = compiled.non_terminal_count
+        closure = {item: set(lookaheads) for item, lookaheads in items.items()}
+        worklist = list(closure)
+        while worklist:
+            production, dot = worklist.pop()
+            rhs = rhs_of[production]
+            if dot >= len(rhs) or rhs[dot] >= non_terminal_count:
+                continue
+            first, nullable = compiled.first_of_sequence(rhs[dot + 1:])
+            if nullable:
+                first |= closure[(production, dot)]
+            for number in compiled.alternatives.get(rhs[dot], ()):
+                item = (number, 0)
+                lookaheads = closure.setdefault(item, set())
+                if not first <= lookaheads:
+                    lookaheads |= first
+                    worklist.append(item)
+        return closure
+
+    def _lalr_reductions(self):
+        """
+        Computes the LALR(1) lookaheads of the kernel items by spontaneous generation and propagation.
+        :return: For every state a list of (production, lookahead set) for its completed items.
+        """
+        rhs_of = self._rhs
+        lookaheads = {(state, item): set() for state, kernel in enumerate(self._kernels) for item in kernel}
+        lookaheads[(0, (0, 0))].add(self._end)
+        propagation = {key: [] for key in lookaheads}
+        for state, kernel in enumerate(self._kernels):
+            for item in kernel:
+                for (production, dot), generated in self._closure_lr1({item: {self._propagate}}).items():
+                    if dot == len(rhs_of[production]):
+                        continue
+                    target = (self._goto[state][rhs_of[production][dot]], (production, dot + 1))
+                    for lookahead in generated:
+                        if lookahead == self._propagate:
+                            propagation[(state, item)].append(target)
+                        else:
+                            lookaheads[target].add(lookahead)
+
+        worklist = [key for key, value in lookaheads.items() if value]
+        while worklist:
+            key = worklist.pop()
+            for target in propagation[key]:
+                if not lookaheads[key] <= lookaheads[target]:
+                    lookaheads[target] |= lookaheads[key]
+                    worklist.append(target)
+
+        reductions = []
+        for state, kernel in enumerate(self._kernels):
+            closure = self._closure_lr1({item: lookaheads[(state, item)] for item in kernel})
+            reductions.append([(production, generated) for (production, dot), generated in closure.items()
+                               if dot == len(rhs_of[production])])
+        return reductions
+
+    def _build_action(self, reductions):
+        non_terminal_count = self._compiled.non_terminal_count
+        for state, goto in enumerate(self._goto):
+            action = {symbol: target for symbol, target in goto.items() if symbol >= non_terminal_count}
+            for production, lookaheads in sorted(reductions[state]):
+                for lookahead in lookaheads:
+                    code = ~production
+                    used = action.get(lookahead)
+                    if used is None:
+                        action[lookahead] = code
+                    elif used != code:
+                        self._add_conflict(state, lookahead, used, code)
+            self._action.append(action)
+
+    def _add_conflict(self, state, terminal, used, code):
+        kind = 'shift/reduce' if used >= 0 else 'reduce/reduce'
+        terminal = self._name(terminal)
+        for conflict in self._conflicts:
+            if conflict[0] == state and conflict[1] == terminal:
+                conflict[3].append(self._describe(code))
+                return
+        self._conflicts.append((state, terminal, kind, [self._describe(used), self._describe(code)]))
+
+    @staticmethod
+    def _describe(code):
+        return ('shift', code) if code >= 0 else ('reduce', ~code)
+
+    def _name(self, symbol):
+        return END_MARKER if symbol == self._end else self._compiled.symbols[symbol]
+
+    def conflicts(self):
+        """
+        :return: List of (state, terminal, 'shift/reduce' or 'reduce/reduce', [('shift', state) or ('reduce', p)]).
+        """
+        return self._conflicts
+
+    def is_conflict_free(self):
+        return not self._conflicts
+
+    def state_count(self):
+        return len(self._kernels)
+
+    def kernel(self, state):
+        """
+        :return: List with the kernel items of the state as (non_terminal, right-hand side, position of the dot).
+        """
+        symbols = self._compiled.symbols
+        return [("S'" if production == 0 else symbols[self._lhs[production]],
+                 [symbols[symbol] for symbol in self._rhs[production]], dot)
+                for production, dot in self._kernels[state]]
+
+    def getState(self):
+        return self._state
+
+    def getIndex(self):
+        return self._index
+
+    def getWorkingStack(self):
+        return self._working_stack
+
+    def getTree(self):
+        return self._tree
+
+    def parse(self, sequence):
+        """
+        Parses the sequence of terminals in one pass, every reduction builds a node of the parse tree.
+        The state becomes 'f' if the sequence is accepted and 'e' otherwise, the index being the error position.
+        The tree and the working stack (the leftmost derivation) have the same form as the ones of the Parser.
+        :param sequence: iterable of terminal names
+        :return: True if the sequence is accepted, False otherwise.
+        """
+        compiled = self._compiled
+        ids = compiled.ids
+        symbols = compiled.symbols
+        lhs_of = self._lhs
+        rhs_of = self._rhs
+        action = self._action
+        goto = self._goto
+        tokens = [ids.get(token, -1) for token in sequence]
+        tokens.append(self._end)
+
+        states = [0]
+        nodes = []
+        index = 0
+        while True:
+            code = action[states[-1]].get(tokens[index])
+            if code is None:
+                self._state = "e"
+                self._index = index
+                self._working_stack = []
+                self._tree = []
+                return False
+            if code >= 0:
+                states.append(code)
+                nodes.append(symbols[tokens[index]])
+                index += 1
+                continue
+            production = ~code
+            if production == 0:
+                break
+            length = len(rhs_of[production])
+            children = nodes[len(nodes) - length:]
+            del nodes[len(nodes) - length:]
+            del states[len(states) - length:]
+            lhs = lhs_of[production]
+            nodes.append((symbols[lhs], production, children))
+            states.append(goto[states[-1]][lhs])
+
+        self._state = "f"
+        self._index = index
+        self._tree, self._working_stack = ParseTree.flatten(nodes[-1])
+        return True
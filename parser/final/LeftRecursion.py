@@ -0,0 +1,297 @@
+from CompiledGrammar import EPSILON
+
+HOLE = -1
+
+
+class LeftRecursionEliminator:
+    """
+    Rewrites a ContextFreeGrammar into an equivalent grammar without left recursion.
+        • indirect left recursion is turned into direct left recursion by substituting the productions of the
+          non-terminals from the same left recursive cycle (in the order in which they are declared)
+        • direct left recursion A -> A$α | β is replaced by A -> β | β$A' and A' -> α | α$A', so no empty
+          production is introduced, or, left factored, by A -> β$A' and A' -> α$A' | epsilon, the form a predictive
+          (LL(1)) parser needs since the first form always gives A two alternatives starting the same way
+    Every production of the new grammar keeps a template telling how it is built from the user's productions:
+        • k >= 0 = the subtree of the k-th symbol of the right-hand side
+        • HOLE = the subtree built so far, threaded through the productions of A'
+        • ('node', p, children) = a node expanded with the user's production p
+        • ('tail', k, inner) = inner is built, then wrapped by the A' subtree of the k-th symbol
+    The templates are used to turn a derivation of the new grammar back into a derivation of the user's grammar.
+    """
+
+    def __init__(self, grammar, factored=False):
+        """
+        :param grammar: a loaded ContextFreeGrammar
+        :param factored: True for the left factored form of the direct left recursion elimination
+        """
+        self.source = grammar
+        self.factored = factored
+        self.rewritten = None
+        self.origin = [None]
+
+    @staticmethod
+    def left_recursive_non_terminals(grammar):
+        """
+        :param grammar: a loaded ContextFreeGrammar
+        :return: Set of the non-terminals A for which A =>+ A$α.
+        """
+        reach = LeftRecursionEliminator._left_corner_reach(grammar)
+        return {non_terminal for non_terminal, reachable in reach.items() if non_terminal in reachable}
+
+    @staticmethod
+    def _left_corner_reach(grammar):
+        """
+        :return: Dictionary non-terminal -> set of non-terminals reachable as left corner in one or more steps.
+        """
+        compiled = grammar.compiled
+        corners = {non_terminal: set() for non_terminal in grammar.rules}
+        for non_terminal, productions in grammar.rules.items():
+            for _, number in productions:
+                rhs = compiled.rhs_names[number]
+                if rhs and rhs[0] in grammar.rules:
+                    corners[non_terminal].add(rhs[0])
+        reach = {}
+        for non_terminal in corners:
+            seen = set()
+            stack = list(corners[non_terminal])
+            while stack:
+                current = stack.pop()
+                if current not in seen:
+                    seen.add(current)
+                    stack.extend(corners[current])
+            reach[non_terminal] = seen
+        return reach
+
+    def eliminate(self):
+        """
+        :return: New ContextFreeGrammar without left recursion, its transformation attribute refers to this object.
+        :raises ValueError: If a left recursive non-terminal has no production to end the recursion.
+        """
+        grammar = self.source
+        compiled = grammar.compiled
+        reach = self._left_corner_reach(grammar)
+        recursive = [non_terminal for non_terminal in grammar.rules if non_terminal in reach[non_terminal]]
+
+        records = {}
+        for non_terminal, productions in grammar.rules.items():
+            records[non_terminal] = []
+            for _, number in productions:
+                rhs = list(compiled.rhs_names[number])
+                records[non_terminal].append((rhs, ('node', number, tuple(range(len(rhs))))))
+
+        tails = {}
+        taken = set(grammar.non_terminals) | set(grammar.terminals) | set(grammar.rules)
+        for i, current in enumerate(recursive):
+            for previous in recursive[:i]:
+                # only the non-terminals of the same cycle can bring the recursion back to current
+                if previous not in reach[current] or current not in reach[previous]:
+                    continue
+                substituted = []
+                for rhs, template in records[current]:
+                    if not rhs or rhs[0] != previous:
+                        substituted.append((rhs, template))
+                        continue
+                    for previous_rhs, previous_template in records[previous]:
+                        substituted.append((previous_rhs + rhs[1:],
+                                            self._substitute(template, previous_template, len(previous_rhs))))
+                records[current] = substituted
+
+            tail = current + "'"
+            while tail in taken:
+                tail += "'"
+            taken.add(tail)
+            records[current], tail_records = self._eliminate_direct(current, records[current], tail, self.factored)
+            if tail_records:
+                tails[current] = (tail, tail_records)
+
+        return self._build(records, tails)
+
+    @staticmethod
+    def _eliminate_direct(non_terminal, records, tail, factored=False):
+        """
+        :return: (productions of the non-terminal, productions of the tail non-terminal)
+        :raises ValueError: If every production of the non-terminal is left recursive.
+        """
+        base = [(rhs, template) for rhs, template in records if not rhs or rhs[0] != non_terminal]
+        recursive = [(rhs[1:], template) for rhs, template in records if len(rhs) > 1 and rhs[0] == non_terminal]
+        if not recursive:
+            return base, []
+        if not base:
+            raise ValueError('The non-terminal {} has only left recursive productions'.format(non_terminal))
+
+        productions = []
+        for rhs, template in base:
+            if not factored:
+                productions.append((rhs, template))
+            productions.append((rhs + [tail], ('tail', len(rhs), template)))
+        tail_productions = []
+        for rhs, template in recursive:
+            template = LeftRecursionEliminator._to_tail(template)
+            if not factored:
+                tail_productions.append((rhs, template))
+            tail_productions.append((rhs + [tail], ('tail', len(rhs), template)))
+        if factored:
+            # A' -> epsilon ends the tail, the subtree built so far is the one of A
+            tail_productions.append(([], HOLE))
+        return productions, tail_productions
+
+    @staticmethod
+    def _shift(template, mapping):
+        """
+        :param mapping: function applied to every slot of the template
+        :return: The template with its slots replaced.
+        """
+        if isinstance(template, int):
+            return template if template == HOLE else mapping(template)
+        if template[0] == 'node':
+            return 'node', template[1], tuple(LeftRecursionEliminator._shift(child, mapping) for child in template[2])
+        return 'tail', mapping(template[1]), LeftRecursionEliminator._shift(template[2], mapping)
+
+    @staticmethod
+    def _substitute(template, first_template, first_length):
+        """
+        :return: Template of A -> δ$γ obtained from A -> B$γ (template) and B -> δ (first_template).
+        """
+        def mapping(slot):
+            return ('first',) if slot == 0 else slot + first_length - 1
+
+        shifted = LeftRecursionEliminator._shift(template, mapping)
+        return LeftRecursionEliminator._replace_first(shifted, first_template)
+
+    @staticmethod
+    def _replace_first(template, first_template):
+        if template == ('first',):
+            return first_template
+        if isinstance(template, int):
+            return template
+        if template[0] == 'node':
+            return 'node', template[1], tuple(LeftRecursionEliminator._replace_first(child, first_template)
+                                              for child in template[2])
+        return 'tail', template[1], LeftRecursionEliminator._replace_first(template[2], first_template)
+
+    @staticmethod
+    def _to_tail(template):
+        """
+        :return: Template of A' -> α obtained from A -> A$α, the subtree of the leading A becomes the HOLE.
+        """
+        shifted = LeftRecursionEliminator._shift(template, lambda slot: ('first',) if slot == 0 else slot - 1)
+        return LeftRecursionEliminator._replace_first(shifted, HOLE)
+
+    def _build(self, records, tails):
+        grammar = self.source
+        rewritten = type(grammar)()
+        rewritten.terminals = list(grammar.terminals)
+        rewritten.start_symbol = grammar.start_symbol
+        rewritten.non_terminals = list(grammar.non_terminals)
+        ordered = [(non_terminal, records[non_terminal]) for non_terminal in grammar.rules]
+        for non_terminal in grammar.rules:
+            if non_terminal in tails:
+                rewritten.non_terminals.append(tails[non_terminal][0])
+                ordered.append(tails[non_terminal])
+
+        number = 1
+        for non_terminal, productions in ordered:
+            rewritten.rules[non_terminal] = []
+            for rhs, template in productions:
+                rewritten.rules[non_terminal].append(('$'.join(rhs) if rhs else EPSILON, number))
+                self.origin.append(template)
+                number += 1
+        rewritten.transformation = self
+        rewritten.compile()
+        self.rewritten = rewritten
+        return rewritten
+
+    def original_derivation(self, working_stack):
+        """
+        :param working_stack: working stack of a successful parse with the rewritten grammar
+        :return: Working stack of the same parse expressed with the productions of the user's grammar.
+        """
+        if not working_stack:
+            return []
+        root = self._derivation_tree(working_stack)
+        original = self._evaluate(self.origin[root[0]], root, HOLE)
+
+        compiled = self.source.compiled
+        derivation = []
+        stack = [original]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                derivation.append(node)
+            else:
+                derivation.append((compiled.symbols[compiled.lhs[node[0]]], node[0]))
+                stack.extend(reversed(node[1]))
+        return derivation
+
+    def _derivation_tree(self, working_stack):
+        """
+        :return: Tree of the derivation as (production, children) nodes, the leaves are terminals.
+        """
+        compiled = self.rewritten.compiled
+        root = None
+        open_nodes = []
+        for element in working_stack:
+            if isinstance(element, tuple):
+                node = (element[1], [])
+                missing = len(compiled.rhs[element[1]])
+            else:
+                node = element
+                missing = 0
+            if open_nodes:
+                parent = open_nodes[-1]
+                parent[0][1].append(node)
+                parent[1] -= 1
+                while open_nodes and open_nodes[-1][1] == 0:
+                    open_nodes.pop()
+            else:
+                root = node
+            if missing:
+                open_nodes.append([node, missing])
+        return root
+
+    def _evaluate(self, template, node, hole):
+        """
+        Evaluates the template with an explicit stack, the derivation being as deep as the input is long.
+        :param template: template of the production used by node
+        :param node: (production, children) node of the rewritten derivation
+        :param hole: subtree built so far for the HOLE of the template
+        :return: Subtree of the user's derivation as (production, children), the leaves are terminals.
+        """
+        values = []
+        # tasks run from the end of the list:
+        #   ('evaluate', template, node, hole) pushes the subtree of the template on values
+        #   ('node', production, child count) replaces the last child count values by the node built from them
+        #   ('tail', tail node) replaces the last value by the subtree the tail node wraps around it
+        tasks = [('evaluate', template, node, hole)]
+        while tasks:
+            task = tasks.pop()
+            if task[0] == 'evaluate':
+                _, template, node, hole = task
+                if isinstance(template, int):
+                    if template == HOLE:
+                        values.append(hole)
+                        continue
+                    child = node[1][template]
+                    if isinstance(child, str):
+                        values.append(child)
+                    else:
+                        tasks.append(('evaluate', self.origin[child[0]], child, HOLE))
+                elif template[0] == 'node':
+                    tasks.append(('node', template[1], len(template[2])))
+                    tasks.extend(('evaluate', child, node, hole) for child in reversed(template[2]))
+                else:
+                    tasks.append(('tail', node[1][template[1]]))
+                    tasks.append(('evaluate', template[2], node, hole))
+            elif task[0] == 'node':
+                first = len(values) - task[2]
+                children = values[first:]
+                del values[first:]
+                values.append((task[1], children))
+            else:
+                tail = task[1]
+                tail_template = self.origin[tail[0]]
+                if not isinstance(tail_template, int) and tail_template[0] == 'tail':
+                    tasks.append(('tail', tail[1][tail_template[1]]))
+                    tail_template = tail_template[2]
+                tasks.append(('evaluate', tail_template, tail, values.pop()))
+        return values[0]
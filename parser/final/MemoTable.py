@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+
+class MemoTable:
+    """
+    Memo table of the descendent recursive parser, keyed by (non-terminal, index).
+    An entry is stored once all the productions of the non-terminal were tried at the index and holds every index
+    where a derivation of the non-terminal can end, together with a reference to the derivation in the log of the
+    parser (see Parser._log), so the derivations share their common parts instead of being copied.
+    An empty list means that the non-terminal derives nothing starting from that index.
+    """
+
+    def __init__(self, limit=None):
+        """
+        :param limit: maximum number of items kept, an item being an end index of an entry (an entry without end
+                      counts as one item), the least recently used entries are evicted first; None keeps every entry
+        """
+        self.limit = limit
+        self._entries = OrderedDict()
+        self._items = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, non_terminal, index):
+        """
+        :return: List of (end index, derivation) if the non-terminal was fully explored at index, None otherwise.
+        """
+        key = (non_terminal, index)
+        ends = self._entries.get(key)
+        if ends is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.limit is not None:
+            self._entries.move_to_end(key)
+        return ends
+
+    def store(self, non_terminal, index, ends):
+        """
+        Marks the exploration of the non-terminal at index as complete.
+        :param ends: dictionary end index -> first derivation found for it, in the order they were found
+        """
+        key = (non_terminal, index)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._items -= self.size(previous)
+        self._entries[key] = list(ends.items())
+        self._items += self.size(ends)
+        while self.limit is not None and self._items > self.limit:
+            _, evicted = self._entries.popitem(last=False)
+            self._items -= self.size(evicted)
+            self.evictions += 1
+
+    @staticmethod
+    def size(ends):
+        """
+        :return: Number of items of the entry with the ends.
+        """
+        return max(1, len(ends))
+
+    def statistics(self):
+        """
+        :return: Dictionary with the counters of the table.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._entries),
+            'items': self._items,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,70 @@
+from TreeStore import TreeStore
+
+
+class ParseTree:
+    """
+    Turns a parse tree given as nested nodes into the father/sibling table printed by PrintParser, kept in a TreeStore.
+    A node is (non_terminal, production number, children) for a non-terminal and the terminal itself for a terminal.
+    The table lists the nodes in preorder, the same order as the working stack of the descendent recursive Parser,
+    and the sibling of a node is the index of the next child of the same father.
+    """
+
+    @staticmethod
+    def flatten(root):
+        """
+        :param root: root node of the parse tree
+        :return: (TreeStore, working stack) where the working stack is the leftmost derivation of the tree
+        """
+        tree = TreeStore()
+        siblings = tree.siblings
+        last_child = []
+        derivation = []
+        # stack of (node, father index), its head at the end
+        stack = [(root, -1)]
+        while stack:
+            node, father = stack.pop()
+            if isinstance(node, str):
+                index = tree.append(node, father)
+                derivation.append(node)
+            else:
+                index = tree.append(node[0], father, node[1])
+                derivation.append((node[0], node[1]))
+                stack.extend((child, index) for child in reversed(node[2]))
+            last_child.append(-1)
+            if father != -1:
+                if last_child[father] != -1:
+                    siblings[last_child[father]] = index
+                last_child[father] = index
+        return tree, derivation
+
+    @staticmethod
+    def from_derivation(derivation, grammar):
+        """
+        Builds the table in one pass over a leftmost derivation, without building the nested nodes.
+        :param derivation: working stack of a successful parse, (non_terminal, production number) for a non-terminal
+                           and the terminal itself for a terminal
+        :param grammar: the ContextFreeGrammar whose productions are used by the derivation
+        :return: TreeStore, the same table as flatten gives for the tree of the derivation.
+        """
+        tree = TreeStore()
+        siblings = tree.siblings
+        # [index, children still expected, index of the last child] for the non-terminals not complete yet
+        open_nodes = []
+        for element in derivation:
+            father = open_nodes[-1] if open_nodes else None
+            if isinstance(element, tuple):
+                index = tree.append(element[0], father[0] if father else -1, element[1])
+            else:
+                index = tree.append(element, father[0] if father else -1)
+            if father:
+                if father[2] != -1:
+                    siblings[father[2]] = index
+                father[2] = index
+                father[1] -= 1
+                if father[1] == 0:
+                    open_nodes.pop()
+            if isinstance(element, tuple):
+                length = len(grammar.production_symbols(element[1]))
+                if length:
+                    open_nodes.append([index, length, -1])
+        return tree
@@ -1,11 +1,15 @@
 import logging
+import os
 
-from Symbol import Symbol
+from MemoTable import MemoTable
+from ParseTree import ParseTree
 from PrintParser import PrintParser
+from TokenSource import TokenStream, read_tokens
+from TraceSink import TraceSink
 
 
 class Parser:
-    def __init__(self, grammar, out_file, in_file):
+    def __init__(self, grammar, out_file=None, in_file=None, trace_level=TraceSink.FULL, memo=False, memo_limit=None):
         """
         working stack: working stack alpha which stores the way the parse is built
         input_stack: input stack beta which is a part of the tree to be built
@@ -16,34 +20,52 @@ class Parser:
             • e = error state – corresponding to insuccess:
          i: position of current symbol in input sequence
         :param grammar: grammar of the language for which we will perform the sequence check
+        :param out_file: file name or file-like object receiving the parse trace, None disables the trace
+        :param in_file: file containing the sequence to be parsed, or an iterable of terminals (e.g. the terminals of
+                        a scanner, see TokenSource), see read_sequence
+        :param trace_level: one of the TraceSink levels
+        :param memo: if True, the results of fully explored (non-terminal, index) pairs are memoized so they are
+                     not derived again after backtracking
+        :param memo_limit: maximum number of memoized end indices kept, see MemoTable, None for no limit; an
+                           expansion reaching more ends than that is not memoized
         """
         self._grammar = grammar
         self._working_stack = []
+        # the input stack is kept with its head at the end of the list so push/pop are O(1)
         self._input_stack = [self._grammar.start_sym()]
         self._state = "q"
         self._index = 0
+        self._steps = 0
         self._tree = []
-        self._out_file = out_file
-        self._sequence = []
-        self.read_sequence(in_file)
-        file = open(self._out_file, 'w')
-        file.write("")
-        file.close()
-
-    def read_sequence(self, sequence_file):
-        with open(sequence_file) as file:
-            if sequence_file == "PIF.out":
-                line = file.readline()
-                while line:
-                    elems_line = line.split("'")
-                    self._sequence.append(elems_line[1])
-                    line = file.readline()
-            else:
-                line = file.readline()
-                while line:
-                    self._sequence.append(line.strip())
-                    line = file.readline()
-        return
+        self._trace = TraceSink(out_file, trace_level)
+        self._memo = MemoTable(memo_limit) if memo else None
+        # memo mode bookkeeping:
+        # cells: cell of every element of the working stack in the derivation log, see _log
+        # frames: expansions still being derived as
+        #         [non_terminal, index, input stack height, working stack position, {end index: derivation}], the
+        #         dictionary becoming None once it holds more ends than memo_limit
+        # closed: expansions fully derived as (frame, working stack length when derived)
+        # replays: derivations taken from the memo as
+        #          (working stack length, non_terminal, index, working stack position, ends, alternative)
+        self._cells = []
+        self._frames = []
+        self._closed = []
+        self._replays = []
+        self._sequence = TokenStream(())
+        if in_file is not None:
+            self.read_sequence(in_file)
+
+    def read_sequence(self, source):
+        """
+        :param source: path of a file with a terminal or a PIF line (token, code) per line, read at once, or an
+                       iterable of terminals, pulled only when the parsing reaches them, or a TokenStream
+        """
+        if isinstance(source, TokenStream):
+            self._sequence = source
+            return
+        if isinstance(source, (str, os.PathLike)):
+            source = list(read_tokens(source))
+        self._sequence = TokenStream(source)
 
     def getTree(self):
         return self._tree
@@ -54,6 +76,12 @@ class Parser:
     def setState(self, value):
         self._state = value
 
+    def getSteps(self):
+        return self._steps
+
+    def getMemoStatistics(self):
+        return self._memo.statistics() if self._memo is not None else None
+
     def getIndex(self):
         return self._index
 
@@ -65,73 +93,88 @@ class Parser:
 
     def setWorkingStack(self, stack):
         self._working_stack = stack
+        self._cells = []
+        if self._memo is not None:
+            for element in stack:
+                self._log(element)
 
     def getInputStack(self):
-        return self._input_stack
+        return self._input_stack[::-1]
 
     def setInputStack(self, stack):
-        self._input_stack = stack
+        self._input_stack = list(reversed(stack))
 
     def printCurrentConfiguration(self):
         print('**************')
         print('State: {}\n'.format(self._state))
         print('Index: {}\n'.format(self._index))
         print('Working stack: {}\n'.format(self._working_stack))
-        print('Input stack: {}\n'.format(self._input_stack))
+        print('Input stack: {}\n'.format(self.getInputStack()))
         print('**************')
 
     def printCurrentConfigurationToFile(self):
-        with open(self._out_file, 'a') as file:
-            file.write("\n--------------\n")
-            file.write('State: ' + str(self._state) + " ")
-            file.write('Index: ' + str(self._index) + "\n")
-            file.write('Working stack: ' + str(self._working_stack) + "\n")
-            file.write('Input stack: ' + str(self._input_stack) + "\n")
+        if self._trace.configurations:
+            self._trace.configuration(self._state, self._index, self._working_stack, self.getInputStack())
 
     def write_in_output_file(self, message, final=False):
-        with open(self._out_file, 'a') as file:
-            if final:
-                file.write("Sequence " + str(message) + " is accepted!\n")
-            else:
-                file.write(message)
+        if final:
+            self._trace.summary("Sequence " + str(message) + " is accepted!\n")
+        else:
+            self._trace.action(message)
 
-    def parsingStrategy(self, w):
+    def parsingStrategy(self, w=None):
         """
         Parse a sequence using descendent recursive parsing
-        :param w: sequence to be parsed
+        :param w: sequence to be parsed, see read_sequence; None or '' (no file name, as main.py passes) parses the
+                  sequence read before, any other empty sequence is parsed as it is
         :return:
         """
-        print("SEQUENCE:   ", self._sequence)
+        # only compared to '', a lazy source must not be measured or read here
+        if w is not None and not (isinstance(w, str) and w == ''):
+            self.read_sequence(w)
         w = self._sequence
+        trace_configurations = self._trace.configurations
+        non_terminals = self._grammar.compiled.non_terminal_set
+        terminals = self._grammar.compiled.terminal_set
+        replays = self._replays
         while self._state != 'f' and self._state != 'e':
-            self.printCurrentConfigurationToFile()
+            self._steps += 1
+            if trace_configurations:
+                self.printCurrentConfigurationToFile()
             if self._state == 'q':
                 # if i = n+1 and input stack is empty => success
-                if self._index == len(w) and len(self._input_stack) == 0:
+                if len(self._input_stack) == 0 and w.at_end(self._index):
                     self.success()
                 # empty input stack and end of the sequence not reached => momentary insuccess
                 elif len(self._input_stack) == 0:
                     self.momentaryInsuccess()
                 # else if head(input stack) is a non-terminal => expand
-                elif self._input_stack[0] in self._grammar.non_terminals_list():
+                elif self._input_stack[-1] in non_terminals:
                     self.expand()
                 # else if head of the input stack = current element in the sequence => advance
-                elif self._index < len(w) and self._input_stack[0] == w[self._index]:
+                elif self._input_stack[-1] == w.get(self._index):
                     self.advance()
                 else:
                     self.momentaryInsuccess()
             elif self._state == 'b':
+                # if head(working stack) is the end of a derivation taken from the memo => try the next one
+                if replays and replays[-1][0] == len(self._working_stack):
+                    self.memoRetry()
                 # if head(working stack) == a - terminal
-                if self._working_stack[-1] in self._grammar.terminals_list():
+                elif self._working_stack[-1] in terminals:
                     self.back()
                 else:
                     self.anotherTry()
+        # printed once parsed, a lazy source is only read as far as the parsing went
+        print("SEQUENCE:   ", w)
         if self._state == 'e':
             print('Error at index {}!'.format(self._index))
+            self._trace.summary('Error at index {}!\n'.format(self._index))
         else:
             print('Sequence {} is accepted!'.format(w))
             print(self._working_stack)
             self.write_in_output_file(self._working_stack, True)
+        self._trace.close()
         self.createParsingTree()
 
     def expand(self):
@@ -143,12 +186,22 @@ class Parser:
         4. Add the corresponding production to the input stack beta
         :return:
         """
-        self.write_in_output_file('expand\n', False)
-        nonTerminal = self._input_stack.pop(0)
+        self._trace.action('expand\n')
+        nonTerminal = self._input_stack.pop()
+        if self._memo is not None:
+            ends = self._memo.get(nonTerminal, self._index)
+            if ends is not None:
+                self.memoHit(nonTerminal, ends)
+                return
+            self._frames.append([nonTerminal, self._index, len(self._input_stack), len(self._working_stack), {}])
         production = self._grammar.productions_for(nonTerminal)[0]
         self._working_stack.append((nonTerminal, production[1]))
-        production_elems = production[0].split('$')
-        self._input_stack = production_elems + self._input_stack
+        if self._memo is not None:
+            self._log(self._working_stack[-1])
+        self._input_stack.extend(reversed(self._grammar.production_symbols(production[1])))
+        if self._frames:
+            # an empty production derives the non-terminal right away
+            self._close_frames()
 
     def advance(self):
         """
@@ -158,10 +211,14 @@ class Parser:
         3. increase index i
         :return:
         """
-        self.write_in_output_file('advance\n', False)
-        nonTerminal = self._input_stack.pop(0)
+        self._trace.action('advance\n')
+        nonTerminal = self._input_stack.pop()
         self._working_stack.append(nonTerminal)
         self._index += 1
+        if self._memo is not None:
+            self._log(nonTerminal)
+        if self._frames:
+            self._close_frames()
 
     def momentaryInsuccess(self):
         """
@@ -169,7 +226,7 @@ class Parser:
         1.State becomes back.
         :return:
         """
-        self.write_in_output_file('momentary insuccess\n', False)
+        self._trace.action('momentary insuccess\n')
         self._state = "b"
 
     def back(self):
@@ -180,10 +237,14 @@ class Parser:
         3. decrease index
         :return:
         """
-        self.write_in_output_file('back\n', False)
+        self._trace.action('back\n')
         last = self._working_stack.pop()
-        self._input_stack = [last] + self._input_stack
+        self._input_stack.append(last)
         self._index -= 1
+        if self._memo is not None:
+            self._cells.pop()
+        if self._closed:
+            self._reopen_frames()
 
     def anotherTry(self):
         """
@@ -203,105 +264,148 @@ class Parser:
 
         :return:
         """
-        self.write_in_output_file('another try\n', False)
+        self._trace.action('another try\n')
         last = self._working_stack.pop()
+        if self._memo is not None:
+            self._cells.pop()
+        if self._closed:
+            self._reopen_frames()
         if self._grammar.has_additional_production(last[0], last[1]):
             self._state = "q"
             self._working_stack.append((last[0], last[1] + 1))
-            production_elems = self._grammar.specific_production(last[0], last[1])
-            lastLength = len(production_elems[0].split('$'))
-            self._input_stack = self._input_stack[lastLength:]
-            production_elems = self._grammar.specific_production(last[0], last[1] + 1)[0]
-            self._input_stack = production_elems.split('$') + self._input_stack
+            if self._memo is not None:
+                self._log(self._working_stack[-1])
+            lastLength = len(self._grammar.production_symbols(last[1]))
+            del self._input_stack[len(self._input_stack) - lastLength:]
+            self._input_stack.extend(reversed(self._grammar.production_symbols(last[1] + 1)))
+            if self._frames:
+                self._close_frames()
         elif self._index == 0 and last[0] == self._grammar.start_sym():
             self._state = "e"
         else:  # step 4
-            production_elems = self._grammar.specific_production(last[0], last[1])
-            lastLength = len(production_elems[0].split('$'))
-            self.write_in_output_file("\nproduction : " + str(production_elems) + '**\n')
-            self.write_in_output_file("\nlast length : " + str(lastLength) + '\n')
-            self._input_stack = self._input_stack[lastLength:]
-            self._input_stack = [last[0]] + self._input_stack
+            lastLength = len(self._grammar.production_symbols(last[1]))
+            if self._trace.level >= TraceSink.ACTIONS:
+                production_elems = self._grammar.specific_production(last[0], last[1])
+                self._trace.action("\nproduction : " + str(production_elems) + '**\n')
+                self._trace.action("\nlast length : " + str(lastLength) + '\n')
+            del self._input_stack[len(self._input_stack) - lastLength:]
+            self._input_stack.append(last[0])
+            if self._memo is not None:
+                # every production was tried, the non-terminal is fully explored at this index
+                frame = self._frames.pop()
+                if frame[4] is not None:
+                    self._memo.store(frame[0], frame[1], frame[4])
+
+    def memoHit(self, nonTerminal, ends):
+        """
+        WHEN: the popped head of the input stack is a non-terminal already fully explored at the current index
+        1. if it derives nothing from here => momentary insuccess, the non-terminal goes back on the input stack
+        2. otherwise put its first memoized derivation on the working stack and move the index after it
+        :return:
+        """
+        self._trace.action('memo hit\n')
+        if not ends:
+            self._input_stack.append(nonTerminal)
+            self._state = "b"
+            return
+        self._replay(nonTerminal, self._index, len(self._working_stack), ends, 0)
+
+    def memoRetry(self):
+        """
+        WHEN: back state and the head of the working stack is the end of a memoized derivation
+        1. remove the derivation from the working stack and restore the index
+        2. if the non-terminal has a derivation with another end => use it and go back to normal state
+        3. otherwise put the non-terminal back on the input stack and stay in back state
+        :return:
+        """
+        self._trace.action('memo retry\n')
+        _, nonTerminal, index, position, ends, alternative = self._replays.pop()
+        del self._working_stack[position:]
+        del self._cells[position:]
+        self._index = index
+        if self._closed:
+            self._reopen_frames()
+        if alternative + 1 < len(ends):
+            self._state = "q"
+            self._replay(nonTerminal, index, position, ends, alternative + 1)
+        else:
+            self._input_stack.append(nonTerminal)
+
+    def _replay(self, nonTerminal, index, position, ends, alternative):
+        end, (first, last) = ends[alternative]
+        derivation = self._derivation(first, last)
+        self._working_stack.extend(derivation)
+        # one cell stands for the whole derivation, the elements inside it are never the head of the working stack
+        self._cells.extend([None] * (len(derivation) - 1))
+        self._cells.append((first, last, self._cells[position - 1] if position else None))
+        self._index = end
+        self._replays.append((len(self._working_stack), nonTerminal, index, position, ends, alternative))
+        if self._frames:
+            self._close_frames()
+
+    def _close_frames(self):
+        # the expansions whose symbols were all consumed from the input stack are derived up to the current index
+        height = len(self._input_stack)
+        while self._frames and self._frames[-1][2] == height:
+            frame = self._frames.pop()
+            ends = frame[4]
+            # only the first derivation reaching an end is kept, the others would be continued the same way
+            if ends is not None and self._index not in ends:
+                if self._memo.limit is not None and len(ends) >= self._memo.limit:
+                    # the entry would not fit in the memo table, its ends are not collected any more
+                    frame[4] = None
+                else:
+                    ends[self._index] = (self._cells[frame[3] - 1] if frame[3] else None, self._cells[-1])
+            self._closed.append((frame, len(self._working_stack)))
+
+    def _log(self, element):
+        # the derivation log is a tree of cells (element, previous cell), the cells of the working stack being a path
+        # of it: a derivation is kept as the cells before its first element and of its last one, and shares its
+        # cells with the working stack and the other derivations
+        self._cells.append((element, self._cells[-1] if self._cells else None))
+
+    @staticmethod
+    def _derivation(first, last):
+        """
+        :param first: cell before the derivation, None if it starts the working stack
+        :param last: cell of the last element of the derivation
+        :return: List of the elements of the derivation, see _log; a cell (first, last, previous cell) stands for a
+                 derivation replayed from the memo.
+        """
+        elements = []
+        # the cells are walked from the last one, a replayed derivation being walked before what precedes it
+        pending = [(first, last)]
+        while pending:
+            first, cell = pending.pop()
+            while cell is not first:
+                if len(cell) == 3:
+                    pending.append((first, cell[2]))
+                    first, cell = cell[0], cell[1]
+                else:
+                    elements.append(cell[0])
+                    cell = cell[1]
+        elements.reverse()
+        return elements
+
+    def _reopen_frames(self):
+        # the expansions derived after the current head of the working stack are being derived again
+        length = len(self._working_stack)
+        while self._closed and self._closed[-1][1] > length:
+            self._frames.append(self._closed.pop()[0])
 
     def success(self):
         """
         1. Mark the state as final
         :return:
         """
-        self.write_in_output_file('success\n', False)
+        self._trace.action('success\n')
         self._state = "f"
 
     def createParsingTree(self):
-        father = -1
-        # For every elem in working stack
-        for index in range(0, len(self._working_stack)):
-            # If elem is a tuple -> (non-terminal, production number)
-            if type(self._working_stack[index]) == tuple:
-                # Add new entry in table and set the value along with production number used
-                self._tree.append(Symbol(self._working_stack[index][0]))  # value
-                self._tree[index].production = self._working_stack[index][1]
-            else:
-                # Else elem is a terminal -> add new entry in table and set the value
-                self._tree.append(Symbol(self._working_stack[index]))
-
-        # Update father - sibling relationship
-        # For every elem in working stack
-        for index in range(0, len(self._working_stack)):
-            # If elem is a tuple -> (non-terminal, production number)
-            if type(self._working_stack[index]) == tuple:
-                # Set the father and update it
-
-                if self._tree[index].father == -1:
-                    self._tree[index].father = father
-                father = index
-
-                # Get the length of the used production
-                prodLen = len(
-                    self._grammar.specific_production(self._working_stack[index][0], self._working_stack[index][1])[
-                        0].split(
-                        '$'))
-                indexList = []
-
-                # Store the indexes in a list
-                for i in range(1, prodLen + 1):
-                    indexList.append(index + i)
-
-                # Compute the right indexes where the elements from the production used are
-                # For every index in indexList
-                for i in range(0, prodLen):
-                    # If in the tree at position indexList[i] is a non-terminal
-                    if self._tree[indexList[i]].production != -1:
-                        # Compute the offset to update the indexes
-                        offset = self.get_length_depth(indexList[i])
-
-                        # For every index remained in indexList add the offset to get the right index position
-                        for j in range(i + 1, prodLen):
-                            indexList[j] += offset
-                            if indexList[j] == len(self._tree):
-                                indexList[j] -= 1
-
-                # Update the left sibling relation
-                # For every index in indexList, except last because it will not be a left sibling to anyone
-                for i in range(0, prodLen - 1):
-                    #   Now that we computed the right indexes we can surely say that the item in the tree at position
-                    # indexList[i] will be a left sibling to item at pos indexList[i+1]
-                    self._tree[indexList[i]].sibling = indexList[i + 1]
-                    if self._tree[indexList[i]].father == -1:
-                        self._tree[indexList[i]].father = father
-                    if i == prodLen - 2 and self._tree[indexList[i + 1]].father == -1:
-                        self._tree[indexList[i + 1]].father = father
-            else:
-                if self._tree[index].father == -1:
-                    self._tree[index].father = father
-                father = -1
-
-    def get_length_depth(self, index):
-        # Get the length of the used production
-
-        prodLen = len(
-            self._grammar.specific_production(self._working_stack[index][0], self._working_stack[index][1])[0].split('$'))
-        sum = prodLen
-        for i in range(1, prodLen + 1):
-            if type(self._working_stack[index + i]) == tuple:
-                sum += self.get_length_depth(index + i)
-        return sum
+        """
+        Builds the father/sibling table of the parse tree from the working stack in one pass, in linear time.
+        """
+        # the tree refers to the user's productions even if the grammar was rewritten (e.g. left recursion)
+        grammar = self._grammar.original_grammar()
+        working_stack = self._grammar.original_derivation(self._working_stack)
+        self._tree = ParseTree.from_derivation(working_stack, grammar)
@@ -1,19 +1,174 @@
-from tabulate import tabulate
+import csv
+import json
+import struct
+import sys
+from array import array
+
+from TreeStore import TreeStore
+
+BINARY_MAGIC = b'LFTCTREE'
+BINARY_VERSION = 1
 
 
 class PrintParser:
+    TABLE = 'table'
+    CSV = 'csv'
+    JSONL = 'jsonl'
+    BINARY = 'binary'
+
+    HEADERS = ['Index', 'Value', 'Parent', 'Left Sibling']
+    # room tabulate leaves around a header
+    HEADER_PADDING = 2
+    # rows buffered before a write
+    BATCH = 4096
+
     def __init__(self, tree):
+        """
+        Writes the father/sibling table of a parse tree, the rows being written while the tree is walked.
+        TABLE is the org-mode table written before with tabulate, with the same layout for parse trees (tabulate
+        aligns the all-numeric values and strips the leading and trailing spaces differently): its column widths are
+        computed by a first pass over the columns, so the table needs no more memory than a batch of rows.
+        CSV and JSONL add the production number of every node, BINARY is read back by read_binary.
+        :param tree: a TreeStore or a list of Symbol
+        """
         self._tree = tree
 
-    def _generate_rows(self):
-        headers = ['Index', 'Value', 'Parent', 'Left Sibling']
-        rows = []
-        for index, item in enumerate(self._tree):
-            rows.append([index, item.value, item.father, item.sibling])
-        return headers, rows
-
-    def printToFile(self, filename):
-        headers, rows = self._generate_rows()
-        with open(filename, 'w') as writer:
-            writer.write('\n')
-            writer.write(tabulate(rows, headers, tablefmt='orgtbl'))
+    def _rows(self):
+        """
+        :return: Iterator over (index, value, father, sibling, production) for every node.
+        """
+        tree = self._tree
+        if isinstance(tree, TreeStore):
+            symbols = tree.symbols
+            columns = zip(tree.values, tree.fathers, tree.siblings, tree.productions)
+            for index, (symbol_id, father, sibling, production) in enumerate(columns):
+                yield index, symbols[symbol_id], father, sibling, production
+        else:
+            for index, item in enumerate(tree):
+                yield index, item.value, item.father, item.sibling, item.production
+
+    def _widths(self):
+        """
+        :return: Width of every column of the table, without its padding.
+        """
+        widths = [len(header) + PrintParser.HEADER_PADDING for header in PrintParser.HEADERS]
+        tree = self._tree
+        if not len(tree):
+            return widths
+        if isinstance(tree, TreeStore):
+            widths[0] = max(widths[0], len(str(len(tree) - 1)))
+            widths[1] = max([widths[1]] + [len(str(value)) for value in tree.symbols])
+            for column, numbers in ((2, tree.fathers), (3, tree.siblings)):
+                widths[column] = max(widths[column], len(str(min(numbers))), len(str(max(numbers))))
+        else:
+            for row in self._rows():
+                for column in range(4):
+                    widths[column] = max(widths[column], len(str(row[column])))
+        return widths
+
+    def printToFile(self, filename, output_format=TABLE):
+        """
+        :param filename: path of the output file
+        :param output_format: PrintParser.TABLE, CSV, JSONL or BINARY
+        """
+        writers = {PrintParser.TABLE: self._write_table, PrintParser.CSV: self._write_csv,
+                   PrintParser.JSONL: self._write_jsonl, PrintParser.BINARY: self._write_binary}
+        if output_format not in writers:
+            raise ValueError('Unknown output format: {}'.format(output_format))
+        if output_format == PrintParser.BINARY:
+            writer = open(filename, 'wb')
+        else:
+            # the csv module writes its own line endings
+            writer = open(filename, 'w', newline='' if output_format == PrintParser.CSV else None)
+        with writer:
+            writers[output_format](writer)
+
+    def _write_table(self, writer):
+        widths = self._widths()
+        # without rows tabulate aligns every header to the left
+        alignments = '><>>' if len(self._tree) else '<<<<'
+        line = '\n| ' + ' | '.join('{{{}:{}{}}}'.format(column, alignment, width)
+                                   for column, (alignment, width) in enumerate(zip(alignments, widths))) + ' |'
+        writer.write(line.format(*PrintParser.HEADERS))
+        writer.write('\n|' + '+'.join('-' * (width + 2) for width in widths) + '|')
+        batch = []
+        for index, value, father, sibling, _ in self._rows():
+            batch.append(line.format(index, str(value), father, sibling))
+            if len(batch) == PrintParser.BATCH:
+                writer.write(''.join(batch))
+                batch.clear()
+        writer.write(''.join(batch))
+
+    def _write_csv(self, writer):
+        rows = csv.writer(writer)
+        rows.writerow(['index', 'value', 'parent', 'left_sibling', 'production'])
+        rows.writerows(self._rows())
+
+    def _write_jsonl(self, writer):
+        batch = []
+        for index, value, father, sibling, production in self._rows():
+            batch.append(json.dumps({'index': index, 'value': value, 'parent': father, 'left_sibling': sibling,
+                                     'production': production}))
+            batch.append('\n')
+            if len(batch) >= 2 * PrintParser.BATCH:
+                writer.write(''.join(batch))
+                batch.clear()
+        writer.write(''.join(batch))
+
+    def _write_binary(self, writer):
+        """
+        Layout, little endian: magic, version (uint32), node count (uint32), symbol count (uint32),
+        every symbol as its length (uint32) and its utf-8 bytes, then the int32 columns values, fathers, siblings
+        and productions, each of node count items.
+        """
+        tree = self._tree
+        if not isinstance(tree, TreeStore):
+            store = TreeStore()
+            for _, value, father, sibling, production in self._rows():
+                store.siblings[store.append(value, father, production)] = sibling
+            tree = store
+        writer.write(BINARY_MAGIC)
+        writer.write(struct.pack('<III', BINARY_VERSION, len(tree), len(tree.symbols)))
+        for symbol in tree.symbols:
+            encoded = str(symbol).encode('utf-8')
+            writer.write(struct.pack('<I', len(encoded)))
+            writer.write(encoded)
+        for column in (tree.values, tree.fathers, tree.siblings, tree.productions):
+            _write_int32(writer, column)
+
+    @staticmethod
+    def read_binary(filename):
+        """
+        :param filename: path of a file written with the BINARY format
+        :return: The TreeStore written in the file.
+        :raises ValueError: If the file is not a tree written with the BINARY format.
+        """
+        with open(filename, 'rb') as reader:
+            if reader.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise ValueError('{} is not a binary parse tree'.format(filename))
+            version, count, symbol_count = struct.unpack('<III', reader.read(12))
+            if version != BINARY_VERSION:
+                raise ValueError('Unsupported binary parse tree version: {}'.format(version))
+            tree = TreeStore()
+            for _ in range(symbol_count):
+                length, = struct.unpack('<I', reader.read(4))
+                tree.intern(reader.read(length).decode('utf-8'))
+            for column in (tree.values, tree.fathers, tree.siblings, tree.productions):
+                column.frombytes(reader.read(column.itemsize * count))
+                if len(column) != count:
+                    raise ValueError('{} is truncated'.format(filename))
+                if sys.byteorder != 'little':
+                    column.byteswap()
+        return tree
+
+
+def _write_int32(writer, column):
+    """
+    Writes an array('i') as little endian int32, the item size of array('i') on the supported platforms.
+    """
+    if sys.byteorder == 'little':
+        column.tofile(writer)
+        return
+    converted = array('i', column)
+    converted.byteswap()
+    converted.tofile(writer)
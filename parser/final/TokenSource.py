@@ -0,0 +1,96 @@
+import re
+from collections.abc import Sequence
+
+# a line of a PIF written by the scanner: the token as a quoted string followed by its position in the symbol table
+PIF_LINE = re.compile(r"""\((?:'([^']*)'|"([^"]*)"), .*\)""")
+# codes the lab1 scanner gives to the tokens standing for a category of terminals
+CATEGORIES = {0: 'identifier', 1: 'constant'}
+
+
+def read_tokens(file_path):
+    """
+    Reads the terminals of a file lazily, one per line: a PIF line (token, code) gives its token, any other line
+    is a terminal once stripped.
+    :param file_path: path of the file
+    :return: Iterator over the terminals.
+    """
+    with open(file_path) as file:
+        for line in file:
+            line = line.strip()
+            match = PIF_LINE.fullmatch(line)
+            if match is None:
+                yield line
+            else:
+                yield match.group(1) if match.group(1) is not None else match.group(2)
+
+
+def pif_terminals(records, categories=None):
+    """
+    Turns the records of a scanner into terminals, e.g. pif_terminals(lab1.scan('p1.txt')) for the lab1 scanner.
+    A token whose code is a category becomes the name of the category, the white space tokens are dropped.
+    :param records: iterable of (token, code, ...) tuples
+    :param categories: dictionary code -> terminal, CATEGORIES by default
+    :return: Iterator over the terminals, produced while the records are.
+    """
+    categories = CATEGORIES if categories is None else categories
+    for record in records:
+        token, code = record[0], record[1]
+        terminal = categories.get(code)
+        if terminal is not None:
+            yield terminal
+        elif not token.isspace():
+            yield token
+
+
+class TokenStream:
+    def __init__(self, source):
+        """
+        Terminals of the sequence being parsed, pulled from the source only when the parser reaches them, so the
+        parsing can start while the source (e.g. a scanner) is still producing them.
+        The terminals already pulled are kept, a backtracking parser goes back to them.
+        :param source: iterable of terminals, a sequence (e.g. a list or a memory-mapped binary PIF) being used as it
+                       is
+        """
+        if isinstance(source, Sequence):
+            self._tokens, self._source = source, None
+        else:
+            self._tokens, self._source = [], iter(source)
+
+    def get(self, index):
+        """
+        :return: The terminal at the index, None if the sequence ends before it.
+        """
+        tokens = self._tokens
+        if index < len(tokens):
+            return tokens[index]
+        while self._source is not None and index >= len(tokens):
+            try:
+                tokens.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return tokens[index] if index < len(tokens) else None
+
+    def at_end(self, index):
+        """
+        :return: True if the sequence has no terminal at the index.
+        """
+        return index >= len(self._tokens) and self.get(index) is None
+
+    def read_all(self):
+        """
+        :return: List of all the terminals, the rest of the source being read.
+        """
+        if self._source is not None:
+            self._tokens.extend(self._source)
+            self._source = None
+        return self._tokens
+
+    def __len__(self):
+        return len(self.read_all())
+
+    def __iter__(self):
+        return iter(self.read_all())
+
+    def __repr__(self):
+        # only the terminals pulled so far, printing must not consume the source
+        return repr(self._tokens)
@@ -0,0 +1,79 @@
+class TraceSink:
+    """
+    Destination of the parse trace written by the Parser.
+    levels:
+        • OFF = nothing is written
+        • SUMMARY = only the final result of the parse
+        • ACTIONS = the final result and the name of every action (expand, advance, back, ...)
+        • FULL = everything above plus the configuration before every step
+    The target is either a file name, opened once for the whole parse, or any object with a write method.
+    """
+    OFF = 0
+    SUMMARY = 1
+    ACTIONS = 2
+    FULL = 3
+
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, target=None, level=FULL):
+        self.level = level if target is not None else TraceSink.OFF
+        self._file = None
+        self._owns_file = False
+        # actions are bound to a no-op below their level so a disabled trace costs a single call per step
+        if self.level < TraceSink.ACTIONS:
+            self.action = self._ignore
+        if self.level == TraceSink.OFF:
+            return
+        if isinstance(target, str):
+            self._file = open(target, 'w', buffering=TraceSink.BUFFER_SIZE)
+            self._owns_file = True
+        else:
+            self._file = target
+
+    @property
+    def configurations(self):
+        """
+        :return: True if the configuration has to be written before every step.
+        """
+        return self.level >= TraceSink.FULL
+
+    def action(self, message):
+        """
+        :param message: text describing a parsing action
+        """
+        self._file.write(message)
+
+    def configuration(self, state, index, working_stack, input_stack):
+        """
+        :param state: state of the parser
+        :param index: position of the current symbol in the input sequence
+        :param working_stack: working stack alpha
+        :param input_stack: input stack beta, head first
+        """
+        self._file.write("\n--------------\nState: " + str(state) + " Index: " + str(index) + "\n" +
+                         "Working stack: " + str(working_stack) + "\n" +
+                         "Input stack: " + str(input_stack) + "\n")
+
+    def summary(self, message):
+        """
+        :param message: text describing the result of the parse
+        """
+        if self.level >= TraceSink.SUMMARY:
+            self._file.write(message)
+
+    def close(self):
+        """
+        Flushes the trace and closes the file if it was opened by the sink.
+        """
+        if self._file is None:
+            return
+        if self._owns_file:
+            self._file.close()
+        elif hasattr(self._file, 'flush'):
+            self._file.flush()
+        self._file = None
+        self.level = TraceSink.OFF
+        self.action = self._ignore
+
+    def _ignore(self, message):
+        pass
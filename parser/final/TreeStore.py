@@ -0,0 +1,145 @@
+from array import array
+
+
+class TreeStore:
+    """
+    Father/sibling table of a parse tree kept in parallel columns instead of one Symbol per node:
+        • fathers, siblings, productions: array('i') indexed by the node, -1 when there is none
+        • values: array('i') with the id of the symbol of every node, symbols[id] being its name
+    The nodes are appended in preorder, so the first child of a node is the node following it.
+    Indexing or iterating the store gives SymbolView objects, which read and write the columns and can be used
+    wherever a list of Symbol was used (e.g. by PrintParser). children, preorder and rows do not create them.
+    """
+
+    def __init__(self):
+        self.fathers = array('i')
+        self.siblings = array('i')
+        self.productions = array('i')
+        self.values = array('i')
+        self.symbols = []
+        self._ids = {}
+
+    def append(self, value, father=-1, production=-1):
+        """
+        :param value: name of the symbol of the node
+        :param father: index of the father node, -1 for the root
+        :param production: production number of a non-terminal, -1 for a terminal
+        :return: Index of the new node.
+        """
+        self.values.append(self.intern(value))
+        self.fathers.append(father)
+        self.siblings.append(-1)
+        self.productions.append(production)
+        return len(self.values) - 1
+
+    def intern(self, value):
+        """
+        :param value: name of a symbol
+        :return: Id of the symbol in symbols, a new one is assigned if the symbol was not seen before.
+        """
+        symbol_id = self._ids.get(value)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self._ids[value] = symbol_id
+            self.symbols.append(value)
+        return symbol_id
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [SymbolView(self, node) for node in range(*index.indices(len(self.values)))]
+        if index < 0:
+            index += len(self.values)
+        if not 0 <= index < len(self.values):
+            raise IndexError('tree index out of range')
+        return SymbolView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.values)):
+            yield SymbolView(self, index)
+
+    def value(self, index):
+        """
+        :return: Name of the symbol of the node.
+        """
+        return self.symbols[self.values[index]]
+
+    def children(self, index):
+        """
+        :param index: index of a node
+        :return: Iterator over the indexes of the children of the node, from left to right.
+        """
+        child = index + 1
+        if child >= len(self.values) or self.fathers[child] != index:
+            return
+        while child != -1:
+            yield child
+            child = self.siblings[child]
+
+    def preorder(self, index=0):
+        """
+        :param index: index of the root of the subtree
+        :return: Iterator over the indexes of the nodes of the subtree in preorder.
+        """
+        if not self.values:
+            return
+        # the subtree is the run of nodes after the root whose father is the root or one of its descendants,
+        # the first node after it has a father placed before the root
+        fathers = self.fathers
+        yield index
+        node = index + 1
+        while node < len(fathers) and fathers[node] >= index:
+            yield node
+            node += 1
+
+    def rows(self):
+        """
+        :return: Iterator over (index, value, father, sibling) for every node, the columns printed by PrintParser.
+        """
+        symbols = self.symbols
+        for index, (symbol_id, father, sibling) in enumerate(zip(self.values, self.fathers, self.siblings)):
+            yield index, symbols[symbol_id], father, sibling
+
+
+class SymbolView:
+    """
+    A node of a TreeStore with the attributes of a Symbol, reading and writing the columns of the store.
+    """
+    __slots__ = ('_store', 'index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self.index = index
+
+    @property
+    def father(self):
+        return self._store.fathers[self.index]
+
+    @father.setter
+    def father(self, value):
+        self._store.fathers[self.index] = value
+
+    @property
+    def sibling(self):
+        return self._store.siblings[self.index]
+
+    @sibling.setter
+    def sibling(self, value):
+        self._store.siblings[self.index] = value
+
+    @property
+    def production(self):
+        return self._store.productions[self.index]
+
+    @production.setter
+    def production(self, value):
+        self._store.productions[self.index] = value
+
+    @property
+    def value(self):
+        return self._store.value(self.index)
+
+    def __str__(self):
+        return f"Value= {self.value}; Sibling= {self.sibling}; Father= {self.father}; Prod= {self.production}"
@@ -0,0 +1,159 @@
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+from BatchParser import BatchParser
+from Grammar import ContextFreeGrammar
+from Parser import Parser
+from PrintParser import PrintParser
+from TraceSink import TraceSink
+
+NESTED_GRAMMAR = """N = S
+E = a, b
+S = S
+P =
+S -> a$S$b | a$b
+"""
+
+IF_ELSE_GRAMMAR = """N = S, B
+E = if, x, {, }, else
+S = S
+P =
+S -> B | B$S
+B -> if${$S$} | if${$S$}$else${$S$} | x
+"""
+
+
+def _if_else_program(depth):
+    if depth == 0:
+        return ['x']
+    return ['if', '{'] + _if_else_program(depth - 1) + ['}', 'else', '{', 'x', '}']
+
+
+def _expression(generator, size):
+    """
+    :return: Terminals of a random expression of g3 with about size operands.
+    """
+    if size <= 1:
+        return [generator.choice(['identifier', 'constant'])]
+    left = generator.randint(1, size - 1)
+    tokens = _expression(generator, left) + [generator.choice(['+', '*'])] + _expression(generator, size - left)
+    return ['('] + tokens + [')'] if generator.random() < 0.3 else tokens
+
+
+def _write(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as file:
+        file.write(content)
+    return path
+
+
+def bench_descendent_recursive(n, trace_level=TraceSink.OFF):
+    """
+    Runs the descendent recursive parser on a^n b^n, a sequence for which the input stack grows to n symbols.
+    The parse tree is not built so only the cost of the parsing steps (and of the trace) is measured.
+    :param n: number of nested a ... b pairs
+    :param trace_level: one of the TraceSink levels
+    :return: (number of steps, seconds)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar(_write(directory, 'g.txt', NESTED_GRAMMAR))
+        sequence = _write(directory, 'seq.txt', 'a\n' * n + 'b\n' * n)
+        parser = Parser(grammar, out_file=os.path.join(directory, 'out.txt'), in_file=sequence,
+                        trace_level=trace_level)
+        parser.createParsingTree = lambda: None
+
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            parser.parsingStrategy('')
+        elapsed = time.perf_counter() - start
+        assert parser.getState() == 'f'
+        return parser.getSteps(), elapsed
+
+
+def bench_memo(depth, memo, memo_limit=None):
+    """
+    Runs the descendent recursive parser on if-else statements nested depth times, the plain backtracking parse is
+    exponential in depth because the if and if-else productions share their prefix.
+    :return: (number of steps, seconds, memo statistics)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar(_write(directory, 'g.txt', IF_ELSE_GRAMMAR))
+        sequence = _write(directory, 'seq.txt', ''.join(token + '\n' for token in _if_else_program(depth)))
+        parser = Parser(grammar, in_file=sequence, trace_level=TraceSink.OFF, memo=memo, memo_limit=memo_limit)
+        parser.createParsingTree = lambda: None
+
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            parser.parsingStrategy('')
+        elapsed = time.perf_counter() - start
+        assert parser.getState() == 'f'
+        return parser.getSteps(), elapsed, parser.getMemoStatistics()
+
+
+def bench_tree(n):
+    """
+    Builds the parse tree of a^n b^n after the parse, the tree is n levels deep.
+    :return: (number of nodes, seconds spent in createParsingTree)
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar(_write(directory, 'g.txt', NESTED_GRAMMAR))
+        sequence = _write(directory, 'seq.txt', 'a\n' * n + 'b\n' * n)
+        parser = Parser(grammar, in_file=sequence, trace_level=TraceSink.OFF)
+        parser.createParsingTree = lambda: None
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            parser.parsingStrategy('')
+        del parser.createParsingTree
+
+        start = time.perf_counter()
+        parser.createParsingTree()
+        elapsed = time.perf_counter() - start
+        return len(parser.getTree()), elapsed
+
+
+def bench_batch(files, operands, workers):
+    """
+    Parses files random expressions of g3 with the LALR engine of a BatchParser, writing the trees.
+    :return: summary of the batch, see BatchParser.summarize
+    """
+    generator = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        inputs = [_write(directory, 'seq{}.txt'.format(index), '\n'.join(_expression(generator, operands)) + '\n')
+                  for index in range(files)]
+        batch = BatchParser('g3.txt', workers=workers, cache_directory=os.path.join(directory, 'cache'))
+        _, summary = batch.run(inputs, os.path.join(directory, 'out'), output_format=PrintParser.BINARY)
+        assert summary['accepted'] == files
+        return summary
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 4000, 16000]
+    for n in sizes:
+        steps, elapsed = bench_descendent_recursive(n)
+        print('a^{0} b^{0}: {1} steps in {2:.3f}s -> {3:,.0f} steps/s'.format(n, steps, elapsed, steps / elapsed))
+    for name in ('OFF', 'SUMMARY', 'ACTIONS'):
+        steps, elapsed = bench_descendent_recursive(sizes[-1], getattr(TraceSink, name))
+        print('trace {0}: {1:,.0f} steps/s'.format(name, steps / elapsed))
+    for n in sizes:
+        nodes, elapsed = bench_tree(n)
+        print('tree of a^{0} b^{0}: {1} nodes in {2:.3f}s'.format(n, nodes, elapsed))
+    for depth in (4, 6, 8):
+        plain_steps, plain_elapsed, _ = bench_memo(depth, False)
+        memo_steps, memo_elapsed, statistics = bench_memo(depth, True)
+        print('if-else depth {0}: plain {1} steps in {2:.3f}s, memo {3} steps in {4:.3f}s (hit rate {5:.0%})'.format(
+            depth, plain_steps, plain_elapsed, memo_steps, memo_elapsed, statistics['hit_rate']))
+    cores = os.cpu_count() or 1
+    for workers in sorted({1, 2, 4, cores}):
+        summary = bench_batch(2000, 50, workers)
+        print('batch of {files} files, {workers} workers: {seconds:.3f}s -> {files_per_second:,.0f} files/s, '
+              '{tokens_per_second:,.0f} tokens/s'.format(**summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 from Grammar import ContextFreeGrammar
+from GrammarCache import GrammarCache
 from Parser import Parser
 from PrintParser import PrintParser
 
 
 def main():
-    grammar = ContextFreeGrammar()
-    grammar.load_grammar("g2.txt")
+    cache = GrammarCache()
+    grammar = cache.load_grammar("g2.txt")
+    if grammar.left_recursive_non_terminals():
+        grammar = cache.transform(grammar, 'left_recursion', ContextFreeGrammar.eliminate_left_recursion)
     parser = Parser(grammar, out_file="out2.txt", in_file="PIF.out")
     parser.parsingStrategy('')
 
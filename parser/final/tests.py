@@ -1,7 +1,21 @@
+import contextlib
+import io
+import os
+import tempfile
+import tracemalloc
 import unittest
 
+from BatchParser import BatchParser
+from EarleyParser import EarleyParser
 from Grammar import ContextFreeGrammar
+from GrammarCache import GrammarCache
+from LL1Parser import LL1Parser
+from LRParser import LRParser
+from ParseTree import ParseTree
 from Parser import Parser
+from PrintParser import PrintParser
+from TokenSource import TokenStream, pif_terminals, read_tokens
+from TraceSink import TraceSink
 
 
 class Tests(unittest.TestCase):
@@ -46,6 +60,15 @@ class Tests(unittest.TestCase):
         self.assertEqual(self.parser.getWorkingStack(), [("S", 1)])
         self.assertEqual(self.parser.getInputStack(), ["a", "b", "c"])
 
+    def test_traceActions(self):
+        trace = io.StringIO()
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g1.txt')
+        parser = Parser(grammar, out_file=trace, trace_level=TraceSink.ACTIONS)
+        parser.expand()
+        parser.momentaryInsuccess()
+        self.assertEqual(trace.getvalue(), 'expand\nmomentary insuccess\n')
+
     def test_anotherTry(self):
         self.parser.setState("b")
         self.parser.setIndex(2)
@@ -57,6 +80,485 @@ class Tests(unittest.TestCase):
         self.assertEqual(self.parser.getInputStack(), ["b", "A"])
         self.assertEqual(self.parser.getState(), 'q')
 
+    def test_memoMatchesBacktracking(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g1.txt')
+        plain = Parser(grammar, in_file='seq.txt')
+        memoized = Parser(grammar, in_file='seq.txt', memo=True, memo_limit=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            plain.parsingStrategy('')
+            memoized.parsingStrategy('')
+        self.assertEqual(memoized.getState(), plain.getState())
+        self.assertEqual(memoized.getWorkingStack(), plain.getWorkingStack())
+        self.assertLessEqual(memoized.getSteps(), plain.getSteps())
+        self.assertLessEqual(memoized.getMemoStatistics()['entries'], 1)
+
+    def test_memoMemoryIsBounded(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g2.txt')
+        rewritten = grammar.eliminate_left_recursion()
+        sequence = ['BEGIN'] + ['identifier', '=', 'identifier', '+', 'constant', ';'] * 100 + ['END']
+        plain = Parser(rewritten, trace_level=TraceSink.OFF)
+        memoized = Parser(rewritten, trace_level=TraceSink.OFF, memo=True)
+        limited = Parser(rewritten, trace_level=TraceSink.OFF, memo=True, memo_limit=20)
+        with contextlib.redirect_stdout(io.StringIO()):
+            plain.parsingStrategy(sequence)
+            tracemalloc.start()
+            try:
+                memoized.parsingStrategy(sequence)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+            limited.parsingStrategy(sequence)
+        # the derivations share the cells of the derivation log instead of copying the working stack
+        self.assertLess(peak, 8 * 2 ** 20)
+        self.assertEqual(memoized.getWorkingStack(), plain.getWorkingStack())
+        self.assertEqual(limited.getWorkingStack(), plain.getWorkingStack())
+        statistics = limited.getMemoStatistics()
+        self.assertLessEqual(statistics['items'], 20)
+        self.assertGreater(statistics['evictions'], 0)
+
+    def test_createParsingTree(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g2.txt')
+        sequence = ['BEGIN', 'integer', 'identifier', ';', 'read', 'identifier', ';', 'if', 'identifier', '>',
+                    'constant', '{', 'write', 'identifier', ';', '}', 'END']
+        with tempfile.TemporaryDirectory() as directory:
+            sequence_file = os.path.join(directory, 'seq.txt')
+            with open(sequence_file, 'w') as file:
+                file.write('\n'.join(sequence) + '\n')
+            parser = Parser(grammar, in_file=sequence_file, trace_level=TraceSink.OFF)
+            with contextlib.redirect_stdout(io.StringIO()):
+                parser.parsingStrategy('')
+            tree_file = os.path.join(directory, 'tree.txt')
+            PrintParser(parser.getTree()).printToFile(tree_file)
+            with open(tree_file) as produced, open('tree.txt') as expected:
+                self.assertEqual(produced.read(), expected.read())
+
+    def test_deepParsingTree(self):
+        depth = 50000
+        self.parser.setWorkingStack([('S', 1), 'a'] + [('A', 2), 'a'] * depth + [('A', 5), 'b'])
+        self.parser.createParsingTree()
+        tree = self.parser.getTree()
+        self.assertEqual(len(tree), 2 * depth + 4)
+        self.assertEqual((tree[-1].father, tree[-2].father), (len(tree) - 2, len(tree) - 4))
+        self.assertEqual([(symbol.father, symbol.sibling) for symbol in tree[:5]],
+                         [(-1, -1), (0, 2), (0, -1), (2, 4), (2, -1)])
+
+
+class TreeStoreTests(unittest.TestCase):
+    def setUp(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g1.txt')
+        self.tree = ParseTree.from_derivation([('S', 1), 'a', ('A', 3), 'b', ('A', 4), 'a'], grammar)
+
+    def test_columns(self):
+        self.assertEqual(list(self.tree.fathers), [-1, 0, 0, 2, 2, 4])
+        self.assertEqual(list(self.tree.siblings), [-1, 2, -1, 4, -1, -1])
+        self.assertEqual(self.tree.symbols, ['S', 'a', 'A', 'b'])
+        self.assertEqual(list(self.tree.rows())[2], (2, 'A', 0, -1))
+
+    def test_traversal(self):
+        self.assertEqual(list(self.tree.children(2)), [3, 4])
+        self.assertEqual(list(self.tree.children(3)), [])
+        self.assertEqual(list(self.tree.preorder(2)), [2, 3, 4, 5])
+        self.assertEqual(list(self.tree.preorder(1)), [1])
+
+    def test_symbolView(self):
+        node = self.tree[-2]
+        self.assertEqual(str(node), 'Value= A; Sibling= -1; Father= 2; Prod= 4')
+        node.sibling = 7
+        self.assertEqual(self.tree.siblings[4], 7)
+        self.assertEqual([symbol.value for symbol in self.tree[1:4]], ['a', 'A', 'b'])
+
+    def test_outputFormats(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tree')
+            printer = PrintParser(self.tree)
+            printer.printToFile(path, PrintParser.CSV)
+            with open(path) as file:
+                self.assertEqual(file.read().splitlines()[:2], ['index,value,parent,left_sibling,production',
+                                                                '0,S,-1,-1,1'])
+            printer.printToFile(path, PrintParser.JSONL)
+            with open(path) as file:
+                self.assertEqual(file.readlines()[3], '{"index": 3, "value": "b", "parent": 2, "left_sibling": 4, '
+                                                      '"production": -1}\n')
+            printer.printToFile(path, PrintParser.BINARY)
+            tree = PrintParser.read_binary(path)
+            self.assertEqual([str(symbol) for symbol in tree], [str(symbol) for symbol in self.tree])
+            self.assertRaises(ValueError, printer.printToFile, path, 'xml')
+
+
+class GrammarTests(unittest.TestCase):
+    def setUp(self):
+        self.grammar = ContextFreeGrammar()
+        self.grammar.load_grammar('g1.txt')
+
+    def test_specificProduction(self):
+        self.assertEqual(self.grammar.specific_production('A', 3), ('b$A', 3))
+        self.assertIsNone(self.grammar.specific_production('S', 3))
+
+    def test_compiled(self):
+        compiled = self.grammar.compiled
+        self.assertEqual(self.grammar.production_symbols(2), ('a', 'A'))
+        self.assertEqual(compiled.rhs[2], (compiled.ids['a'], compiled.ids['A']))
+        self.assertEqual(compiled.alternatives[compiled.ids['A']], (2, 3, 4, 5))
+        self.assertTrue(compiled.is_non_terminal_id(compiled.ids['S']))
+        self.assertFalse(compiled.is_non_terminal_id(compiled.ids['b']))
+        self.assertTrue(self.grammar.is_terminal('b'))
+        self.assertFalse(self.grammar.is_terminal('A'))
+
+
+class GrammarCacheTests(unittest.TestCase):
+    def test_cachedTablesAndInvalidation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            grammar_file = os.path.join(directory, 'g.txt')
+            with open('g3.txt') as source, open(grammar_file, 'w') as file:
+                file.write(source.read())
+            cache_directory = os.path.join(directory, 'cache')
+            sequence = ['identifier', '*', '(', 'constant', ')']
+            cold = GrammarCache(cache_directory)
+            expected = cold.lr_parser(cold.load_grammar(grammar_file))
+            self.assertTrue(expected.parse(sequence))
+            self.assertEqual(cold.misses, 2)
+
+            warm = GrammarCache(cache_directory)
+            parser = warm.lr_parser(warm.load_grammar(grammar_file))
+            self.assertEqual((warm.hits, warm.misses), (2, 0))
+            self.assertTrue(parser.parse(sequence))
+            self.assertEqual(parser.getWorkingStack(), expected.getWorkingStack())
+
+            with open(grammar_file, 'a') as file:
+                file.write('factor -> -$factor\n')
+            changed = GrammarCache(cache_directory)
+            parser = changed.lr_parser(changed.load_grammar(grammar_file))
+            self.assertEqual((changed.hits, changed.misses), (0, 2))
+            self.assertTrue(parser.parse(['-'] + sequence))
+            self.assertEqual(len(os.listdir(cache_directory)), 2)
+
+    def test_sameNameInOtherDirectories(self):
+        with tempfile.TemporaryDirectory() as directory:
+            grammar_files = [os.path.join(directory, name, 'g.txt') for name in ('first', 'second')]
+            for grammar_file, grammar in zip(grammar_files, ('g3.txt', 'g2.txt')):
+                os.makedirs(os.path.dirname(grammar_file))
+                with open(grammar, 'rb') as source, open(grammar_file, 'wb') as file:
+                    file.write(source.read())
+            cache_directory = os.path.join(directory, 'cache')
+            for grammar_file in grammar_files:
+                cache = GrammarCache(cache_directory)
+                grammar = cache.load_grammar(grammar_file)
+                cache.transform(grammar, 'left_recursion', ContextFreeGrammar.eliminate_left_recursion)
+                self.assertEqual(cache.misses, 2)
+            self.assertEqual(len(os.listdir(cache_directory)), 4)
+
+            # a missing grammar entry is built again, the other entries of the same file are kept
+            for name in os.listdir(cache_directory):
+                if name.endswith('-grammar.pickle'):
+                    os.unlink(os.path.join(cache_directory, name))
+            for grammar_file in grammar_files:
+                cache = GrammarCache(cache_directory)
+                grammar = cache.load_grammar(grammar_file)
+                cache.transform(grammar, 'left_recursion', ContextFreeGrammar.eliminate_left_recursion)
+                self.assertEqual((cache.hits, cache.misses), (1, 1))
+            self.assertEqual(len(os.listdir(cache_directory)), 4)
+
+
+class LeftRecursionTests(unittest.TestCase):
+    def setUp(self):
+        self.grammar = ContextFreeGrammar()
+        self.grammar.load_grammar('g2.txt')
+
+    def test_detect(self):
+        self.assertEqual(self.grammar.left_recursive_non_terminals(), {'expression', 'term'})
+
+    def test_eliminate(self):
+        rewritten = self.grammar.eliminate_left_recursion()
+        self.assertEqual(rewritten.left_recursive_non_terminals(), set())
+        self.assertEqual(rewritten.productions_for('expression'), [('term', 14), ("term$expression'", 15)])
+        self.assertEqual(rewritten.productions_for("expression'")[1], ("+$term$expression'", 36))
+
+    def test_parseRefersToUserProductions(self):
+        rewritten = self.grammar.eliminate_left_recursion()
+        sequence = ['BEGIN', 'integer', 'identifier', ';', 'identifier', '=', 'identifier', '+', 'constant', '*',
+                    'identifier', '-', 'constant', ';', 'END']
+        with tempfile.TemporaryDirectory() as directory:
+            in_file = os.path.join(directory, 'seq.txt')
+            with open(in_file, 'w') as file:
+                file.write('\n'.join(sequence) + '\n')
+            parser = Parser(rewritten, in_file=in_file, memo=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                parser.parsingStrategy('')
+        self.assertEqual(parser.getState(), 'f')
+        derivation = rewritten.original_derivation(parser.getWorkingStack())
+        self.assertEqual([element for element in derivation if type(element) == str], sequence)
+        self.assertIn(('expression', 16), derivation)
+        self.assertIn(('expression', 15), derivation)
+        self.assertIn(('term', 18), derivation)
+        self.assertEqual(max(symbol.production for symbol in parser.getTree()), 26)
+
+    def test_longStatementList(self):
+        rewritten = self.grammar.eliminate_left_recursion()
+        count = 400
+        sequence = ['BEGIN'] + ['identifier', '=', 'identifier', '+', 'constant', ';'] * count + ['END']
+        parser = Parser(rewritten, trace_level=TraceSink.OFF)
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parsingStrategy(sequence)
+        self.assertEqual(parser.getState(), 'f')
+        parser.createParsingTree()
+        tree = parser.getTree()
+        self.assertEqual([symbol.value for symbol in tree if symbol.production == -1], sequence)
+        self.assertEqual(sum(1 for symbol in tree if symbol.value == 'statement_list'), count)
+        self.assertEqual(sum(1 for symbol in tree if (symbol.value, symbol.production) == ('expression', 15)), count)
+
+
+class LL1Tests(unittest.TestCase):
+    def setUp(self):
+        self.grammar = ContextFreeGrammar()
+        self.grammar.load_grammar('g3.txt')
+        self.parser = LL1Parser(self.grammar)
+
+    def test_firstFollow(self):
+        self.assertEqual(self.parser.first('expression'), {'(', 'identifier', 'constant'})
+        self.assertEqual(self.parser.first('term_tail'), {'*', 'epsilon'})
+        self.assertEqual(self.parser.follow('term'), {'+', ')', '$'})
+        self.assertEqual(self.parser.follow('expression_tail'), {')', '$'})
+
+    def test_conflicts(self):
+        self.assertTrue(self.parser.is_ll1())
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g1.txt')
+        self.assertEqual(LL1Parser(grammar).conflicts(), [('A', 'a', [2, 4]), ('A', 'b', [3, 5])])
+
+    def test_parseMatchesBacktracking(self):
+        sequence = ['(', 'identifier', '+', 'constant', ')', '*', 'identifier']
+        self.assertTrue(self.parser.parse(sequence))
+        self.assertEqual(self.parser.getState(), 'f')
+        with tempfile.TemporaryDirectory() as directory:
+            in_file = os.path.join(directory, 'seq.txt')
+            with open(in_file, 'w') as file:
+                file.write('\n'.join(sequence) + '\n')
+            parser = Parser(self.grammar, in_file=in_file)
+            with contextlib.redirect_stdout(io.StringIO()):
+                parser.parsingStrategy('')
+        self.assertEqual(self.parser.getWorkingStack(), parser.getWorkingStack())
+        tree = self.parser.getTree()
+        self.assertEqual([(symbol.value, symbol.father, symbol.sibling) for symbol in tree[:5]],
+                         [('expression', -1, -1), ('term', 0, 22), ('factor', 1, 17), ('(', 2, 4),
+                          ('expression', 2, 16)])
+
+    def test_error(self):
+        self.assertFalse(self.parser.parse(['identifier', '+', ')']))
+        self.assertEqual(self.parser.getState(), 'e')
+        self.assertEqual(self.parser.getIndex(), 2)
+
+    def test_truncatedInput(self):
+        with tempfile.TemporaryDirectory() as directory:
+            grammar_file = os.path.join(directory, 'g.txt')
+            with open(grammar_file, 'w') as file:
+                file.write('N = S\nE = a, b\nS = S\nP =\nS -> a$b\n')
+            grammar = ContextFreeGrammar()
+            grammar.load_grammar(grammar_file)
+        parser = LL1Parser(grammar)
+        self.assertTrue(parser.is_ll1())
+        for sequence, index in (['a'], 1), ([], 0), (['b'], 0):
+            self.assertFalse(parser.parse(sequence))
+            self.assertEqual(parser.getState(), 'e')
+            self.assertEqual(parser.getIndex(), index)
+            self.assertEqual(parser.getTree(), [])
+        self.assertTrue(parser.parse(['a', 'b']))
+
+
+class LRTests(unittest.TestCase):
+    def test_slrConflictSolvedByLalr(self):
+        with tempfile.TemporaryDirectory() as directory:
+            grammar_file = os.path.join(directory, 'g.txt')
+            with open(grammar_file, 'w') as file:
+                file.write('N = S, L, R\nE = =, *, id\nS = S\nP =\nS -> L$=$R | R\nL -> *$R | id\nR -> L\n')
+            grammar = ContextFreeGrammar()
+            grammar.load_grammar(grammar_file)
+        self.assertEqual(LRParser(grammar, LRParser.SLR).conflicts(),
+                         [(2, '=', 'shift/reduce', [('shift', 6), ('reduce', 5)])])
+        parser = LRParser(grammar, LRParser.LALR)
+        self.assertTrue(parser.is_conflict_free())
+        self.assertTrue(parser.parse(['*', 'id', '=', 'id']))
+
+    def test_sameTreeAsLL1(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g3.txt')
+        sequence = ['(', 'identifier', '+', 'constant', ')', '*', 'identifier']
+        lr, ll = LRParser(grammar), LL1Parser(grammar)
+        self.assertTrue(lr.parse(sequence))
+        self.assertTrue(ll.parse(sequence))
+        self.assertEqual(lr.getWorkingStack(), ll.getWorkingStack())
+        self.assertEqual([str(symbol) for symbol in lr.getTree()], [str(symbol) for symbol in ll.getTree()])
+
+    def test_leftRecursiveGrammar(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g2.txt')
+        parser = LRParser(grammar)
+        self.assertTrue(parser.is_conflict_free())
+        sequence = ['BEGIN', 'identifier', '=', 'identifier', '+', 'constant', '-', 'constant', ';', 'END']
+        self.assertTrue(parser.parse(sequence))
+        self.assertEqual(parser.getWorkingStack()[7:10], [('expression', 16), ('expression', 15), ('expression', 14)])
+        self.assertFalse(parser.parse(['BEGIN', 'identifier', '=', ';', 'END']))
+        self.assertEqual(parser.getIndex(), 3)
+
+
+class EarleyTests(unittest.TestCase):
+    def test_ambiguousGrammar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            grammar_file = os.path.join(directory, 'g.txt')
+            with open(grammar_file, 'w') as file:
+                file.write('N = E\nE = +, a\nS = E\nP =\nE -> E$+$E | a | epsilon\n')
+            grammar = ContextFreeGrammar()
+            grammar.load_grammar(grammar_file)
+        parser = EarleyParser(grammar, keep_forest=True)
+        self.assertTrue(parser.parse(['a', '+', 'a', '+', 'a']))
+        self.assertEqual(len(parser.forest()[(1, 3, 0, 5)]), 2)
+        self.assertTrue(parser.parse(['+']))
+        self.assertEqual(parser.getWorkingStack(), [('E', 1), ('E', 3), '+', ('E', 3)])
+
+    def test_sameTreeAsLR(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g3.txt')
+        sequence = ['(', 'identifier', '+', 'constant', ')', '*', 'identifier']
+        earley, lr = EarleyParser(grammar), LRParser(grammar)
+        self.assertTrue(earley.parse(sequence))
+        self.assertTrue(lr.parse(sequence))
+        self.assertEqual(earley.getWorkingStack(), lr.getWorkingStack())
+        self.assertEqual([str(symbol) for symbol in earley.getTree()], [str(symbol) for symbol in lr.getTree()])
+
+    def test_rightRecursionIsLinear(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g2.txt')
+        parser, lr = EarleyParser(grammar), LRParser(grammar)
+        statement = ['identifier', '=', 'identifier', '+', 'constant', ';']
+        counts = []
+        for n in (50, 100):
+            sequence = ['BEGIN'] + statement * n + ['END']
+            self.assertTrue(parser.parse(sequence))
+            self.assertTrue(lr.parse(sequence))
+            self.assertEqual(parser.getWorkingStack(), lr.getWorkingStack())
+            counts.append(parser.item_count())
+        self.assertLess(counts[1], 2.1 * counts[0])
+        self.assertFalse(parser.parse(['BEGIN', 'identifier', '=', ';', 'END']))
+        self.assertEqual(parser.getIndex(), 3)
+
+
+class TokenSourceTests(unittest.TestCase):
+    def test_readTokens(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pif_file = os.path.join(directory, 'PIF.out')
+            with open(pif_file, 'w') as file:
+                file.write("('BEGIN', 0)\n('identifier', (3, 0))\n(\"'\", 0)\nEND\n")
+            self.assertEqual(list(read_tokens(pif_file)), ['BEGIN', 'identifier', "'", 'END'])
+
+    def test_pifTerminals(self):
+        records = [('x', 0, 0), (' ', 52, 1), ('=', 9, 2), ('12', 1, 4), ('\n', 54, 6)]
+        self.assertEqual(list(pif_terminals(records)), ['identifier', '=', 'constant'])
+
+    def test_parseStream(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g1.txt')
+        with open('seq.txt') as file:
+            sequence = file.read().split()
+        from_file = Parser(grammar, in_file='seq.txt')
+        from_stream = Parser(grammar, in_file=iter(sequence))
+        with contextlib.redirect_stdout(io.StringIO()):
+            from_file.parsingStrategy()
+            from_stream.parsingStrategy()
+        self.assertEqual(from_stream.getState(), 'f')
+        self.assertEqual(from_stream.getWorkingStack(), from_file.getWorkingStack())
+
+    def test_parseBeforeScanningEnds(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g1.txt')
+        pulled = []
+
+        def scanner():
+            for token in ['b', 'a', 'a', 'a']:
+                pulled.append(token)
+                yield token
+        parser = Parser(grammar, trace_level=TraceSink.OFF)
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.parsingStrategy(scanner())
+        self.assertEqual(parser.getState(), 'e')
+        # no sentence of g1 starts with b, the rest of the tokens is never scanned
+        self.assertEqual(pulled, ['b'])
+
+    def test_sequenceArguments(self):
+        grammar = ContextFreeGrammar()
+        grammar.load_grammar('g1.txt')
+        pulled = []
+
+        def scanner():
+            for token in ['b', 'a']:
+                pulled.append(token)
+                yield token
+        parser = Parser(grammar, in_file='seq.txt', trace_level=TraceSink.OFF)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            # an empty sequence is parsed, not the one read before
+            parser.parsingStrategy([])
+            self.assertEqual((parser.getState(), parser.getIndex()), ('e', 0))
+            parser = Parser(grammar, in_file='seq.txt', trace_level=TraceSink.OFF)
+            parser.parsingStrategy(TokenStream(scanner()))
+        self.assertEqual(parser.getState(), 'e')
+        self.assertEqual(pulled, ['b'])
+        self.assertIn("SEQUENCE:    ['b']", output.getvalue())
+
+
+class BatchParserTests(unittest.TestCase):
+    def test_batch(self):
+        sequences = [['identifier', '*', 'constant'], ['(', 'identifier', '+'], ['(', 'constant', ')']]
+        with tempfile.TemporaryDirectory() as directory:
+            inputs = []
+            for index, sequence in enumerate(sequences):
+                inputs.append(os.path.join(directory, 'seq{}.txt'.format(index)))
+                with open(inputs[-1], 'w') as file:
+                    file.write('\n'.join(sequence) + '\n')
+            inputs.append(os.path.join(directory, 'missing.txt'))
+            output = os.path.join(directory, 'out')
+            batch = BatchParser('g3.txt', workers=2, cache_directory=os.path.join(directory, 'cache'))
+            results, summary = batch.run(inputs, output)
+            self.assertEqual([result['file'] for result in results], inputs)
+            self.assertEqual([result['accepted'] for result in results], [True, False, True, False])
+            self.assertEqual(results[1]['index'], 3)
+            self.assertIsNotNone(results[3]['error'])
+            self.assertEqual({key: summary[key] for key in ('files', 'accepted', 'rejected', 'failed', 'tokens')},
+                             {'files': 4, 'accepted': 2, 'rejected': 1, 'failed': 1, 'tokens': 9})
+            grammar = ContextFreeGrammar()
+            grammar.load_grammar('g3.txt')
+            parser = LRParser(grammar)
+            parser.parse(sequences[0])
+            expected = os.path.join(directory, 'expected.tree')
+            PrintParser(parser.getTree()).printToFile(expected)
+            with open(results[0]['tree']) as produced, open(expected) as tree:
+                self.assertEqual(produced.read(), tree.read())
+            self.assertTrue(os.path.exists(os.path.join(output, BatchParser.SUMMARY)))
+
+    def test_ll1LeftRecursiveGrammar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            grammar_file = os.path.join(directory, 'g.txt')
+            with open(grammar_file, 'w') as file:
+                file.write('N = E, T\nE = +, identifier\nS = E\nP =\nE -> E$+$T | T\nT -> identifier\n')
+            sequence_file = os.path.join(directory, 'seq.txt')
+            with open(sequence_file, 'w') as file:
+                file.write('identifier\n+\nidentifier\n+\nidentifier\n')
+            cache_directory = os.path.join(directory, 'cache')
+            results, _ = BatchParser(grammar_file, 'll1', workers=1, cache_directory=cache_directory).run(
+                [sequence_file], os.path.join(directory, 'll1'))
+            self.assertTrue(results[0]['accepted'])
+            expected, _ = BatchParser(grammar_file, workers=1, cache_directory=cache_directory).run(
+                [sequence_file], os.path.join(directory, 'lalr'))
+            # the LL(1) tree refers to the user's left recursive productions, as the LR one
+            with open(results[0]['tree']) as produced, open(expected[0]['tree']) as tree:
+                self.assertEqual(produced.read(), tree.read())
+
+            with open(grammar_file, 'a') as file:
+                file.write('T -> identifier$+$T\n')
+            self.assertRaises(ValueError, BatchParser, grammar_file, 'll1', workers=1, cache_directory=cache_directory)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,256 @@
+import ast
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+MAGIC = b'LFTCPIF\0'
+VERSION = 1
+# magic, version, record count, symbol count, string count, size of the string pool
+HEADER = struct.Struct('<8sIIIII')
+# codes of the tokens standing for a category of terminals
+CATEGORIES = {0: 'identifier', 1: 'constant'}
+RECORD_COLUMNS = 5
+SYMBOL_COLUMNS = 4
+
+
+def _pool_size(size):
+    # the pool is padded so the int32 columns after it are aligned
+    return (size + 3) & ~3
+
+
+def write(file_name, records, symbol_table=None, categories=None):
+    """
+    Writes a PIF and its symbol table in the binary format, little endian:
+        • the header: MAGIC, VERSION and the record, symbol, string and pool sizes
+        • the offsets of the strings in the pool (uint32, string count + 1) and the pool of utf-8 strings, every
+          distinct string being stored once
+        • the record columns (int32): terminal string, token string, code, symbol table bucket and position,
+          -1 when the token has no symbol table reference
+        • the symbol columns (int32): key string, value string, bucket and position
+    :param records: iterable of (token, code, reference), reference being a (bucket, position) pair or None
+    :param symbol_table: a lab1 HashTable, or any object whose items() gives (key, value, (bucket, position))
+    :param categories: dictionary code -> terminal of the tokens standing for a category, CATEGORIES by default
+    """
+    categories = CATEGORIES if categories is None else categories
+    strings = {}
+    columns = [array('i') for _ in range(RECORD_COLUMNS)]
+    terminals, tokens, codes, buckets, positions = columns
+    for token, code, reference in records:
+        terminal = categories.get(code, token)
+        terminals.append(strings.setdefault(terminal, len(strings)))
+        tokens.append(strings.setdefault(token, len(strings)))
+        codes.append(-1 if code is None else code)
+        bucket, position = reference if reference is not None else (-1, -1)
+        buckets.append(bucket)
+        positions.append(position)
+    symbols = [array('i') for _ in range(SYMBOL_COLUMNS)]
+    if symbol_table is not None:
+        for key, value, (bucket, position) in symbol_table.items():
+            for column, item in zip(symbols, (strings.setdefault(key, len(strings)),
+                                              strings.setdefault(str(value), len(strings)), bucket, position)):
+                column.append(item)
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = array('I', [0])
+    for string in encoded:
+        offsets.append(offsets[-1] + len(string))
+    pool = b''.join(encoded)
+    with open(file_name, 'wb') as output_file:
+        output_file.write(HEADER.pack(MAGIC, VERSION, len(terminals), len(symbols[0]), len(encoded), len(pool)))
+        _write_column(output_file, offsets)
+        output_file.write(pool + bytes(_pool_size(len(pool)) - len(pool)))
+        for column in columns + symbols:
+            _write_column(output_file, column)
+
+
+def _write_column(output_file, column):
+    if sys.byteorder != 'little':
+        column = array(column.typecode, column)
+        column.byteswap()
+    column.tofile(output_file)
+
+
+class PifFile(Sequence):
+    # attributes removed by close, using one of them afterwards raises ValueError
+    _RELEASED = ('_offsets', '_pool', 'terminals', 'tokens', 'codes', 'buckets', 'positions', '_keys', '_values',
+                 '_symbol_buckets', '_symbol_positions', '_view', '_count', '_symbol_count', '_strings')
+
+    def __init__(self, file_name):
+        """
+        A binary PIF mapped in memory. As a sequence it gives the terminal of every record, so it can be handed
+        to the Parser instead of a list: the columns are read in place through memoryviews and the strings are
+        decoded once, the first time they are used.
+        :param file_name: path of a file written by write
+        :raises ValueError: If the file is not a binary PIF.
+        """
+        self.file_name = file_name
+        self._map = None
+        with open(file_name, 'rb') as input_file:
+            # an empty file can not be mapped
+            if os.fstat(input_file.fileno()).st_size == 0:
+                raise ValueError('{} is not a binary PIF'.format(file_name))
+            self._map = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        self._view = view
+        columns = []
+        try:
+            if len(view) < HEADER.size:
+                raise ValueError('{} is not a binary PIF'.format(file_name))
+            magic, version, self._count, self._symbol_count, string_count, pool_size = HEADER.unpack_from(view)
+            if magic != MAGIC:
+                raise ValueError('{} is not a binary PIF'.format(file_name))
+            if version != VERSION:
+                raise ValueError('Unsupported binary PIF version: {}'.format(version))
+            offset = HEADER.size
+            self._offsets = self._column(view, offset, string_count + 1, 'I')
+            offset += 4 * (string_count + 1)
+            self._pool = view[offset:offset + pool_size]
+            offset += _pool_size(pool_size)
+            for count, column_count in ((self._count, RECORD_COLUMNS), (self._symbol_count, SYMBOL_COLUMNS)):
+                for _ in range(column_count):
+                    columns.append(self._column(view, offset, count, 'i'))
+                    offset += 4 * count
+            if offset != len(view):
+                raise ValueError('{} is truncated'.format(file_name))
+        except BaseException:
+            # the columns are not attributes yet, close would not release them and could not unmap the file
+            for column in columns:
+                if isinstance(column, memoryview):
+                    column.release()
+            self.close()
+            raise
+        (self.terminals, self.tokens, self.codes, self.buckets, self.positions,
+         self._keys, self._values, self._symbol_buckets, self._symbol_positions) = columns
+        self._strings = [None] * string_count
+
+    def _column(self, view, offset, count, type_code):
+        if offset + 4 * count > len(view):
+            raise ValueError('{} is truncated'.format(self.file_name))
+        column = view[offset:offset + 4 * count].cast(type_code)
+        if sys.byteorder != 'little':
+            # the format is little endian, a big endian machine has to copy the column
+            column = array(type_code, column)
+            column.byteswap()
+        return column
+
+    def string(self, string_id):
+        """
+        :return: The string of the pool with the id.
+        """
+        string = self._strings[string_id]
+        if string is None:
+            string = str(self._pool[self._offsets[string_id]:self._offsets[string_id + 1]], 'utf-8')
+            self._strings[string_id] = string
+        return string
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.string(self.terminals[record]) for record in range(*index.indices(self._count))]
+        return self.string(self.terminals[index])
+
+    def record(self, index):
+        """
+        :return: (token, code, reference) of the record, reference being (bucket, position) or None.
+        """
+        code = self.codes[index]
+        bucket = self.buckets[index]
+        reference = (bucket, self.positions[index]) if bucket != -1 else None
+        return self.string(self.tokens[index]), None if code == -1 else code, reference
+
+    def records(self):
+        """
+        :return: Iterator over the (token, code, reference) of the records.
+        """
+        for index in range(self._count):
+            yield self.record(index)
+
+    def symbols(self):
+        """
+        :return: Iterator over the (key, value, (bucket, position)) of the symbol table.
+        """
+        for index in range(self._symbol_count):
+            yield (self.string(self._keys[index]), self.string(self._values[index]),
+                   (self._symbol_buckets[index], self._symbol_positions[index]))
+
+    def items(self):
+        # the symbol table as a HashTable gives it, so a PifFile can be written again by write
+        return self.symbols()
+
+    def close(self):
+        """
+        Releases the views and unmaps the file, the sequence can not be used any more.
+        """
+        for name in PifFile._RELEASED:
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    @property
+    def closed(self):
+        return self._map is None
+
+    def __getattr__(self, name):
+        # only called for a missing attribute, the ones close removed among them
+        if name in PifFile._RELEASED and self.__dict__.get('_map', True) is None:
+            raise ValueError('I/O operation on closed PifFile {!r}'.format(self.file_name))
+        raise AttributeError("'PifFile' object has no attribute {!r}".format(name))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        if self.closed:
+            return 'PifFile({!r}, closed)'.format(self.file_name)
+        return 'PifFile({!r}, {} records)'.format(self.file_name, self._count)
+
+
+def read_text(file_name):
+    """
+    Reads a text PIF, either the lines "token -> code" written by lab1, optionally followed by a (bucket, position)
+    reference, or the lines ('token', reference) of PIF.out whose tokens are already terminals.
+    :return: Iterator over (token, code, reference), the code being None in the PIF.out form.
+    """
+    with open(file_name) as input_file:
+        for line in input_file:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            if line.startswith('(') and line.endswith(')'):
+                token, reference = ast.literal_eval(line)
+                yield token, None, reference if isinstance(reference, tuple) else None
+                continue
+            token, _, rest = line.rpartition(' -> ')
+            code, _, reference = rest.partition(' ')
+            yield token, int(code) if code != 'None' else None, ast.literal_eval(reference) if reference else None
+
+
+def write_text(records, file_name):
+    """
+    Writes (token, code, reference) records as the lines "token -> code", followed by the reference if there is one.
+    """
+    with open(file_name, 'w') as output_file:
+        for token, code, reference in records:
+            if reference is None:
+                output_file.write(f"{token} -> {code}\n")
+            else:
+                output_file.write(f"{token} -> {code} {reference}\n")
+
+
+def text_to_binary(text_file_name, binary_file_name, symbol_table=None):
+    write(binary_file_name, read_text(text_file_name), symbol_table)
+
+
+def binary_to_text(binary_file_name, text_file_name):
+    with PifFile(binary_file_name) as pif:
+        write_text(pif.records(), text_file_name)
@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+import lab1
+
+
+def scan_text(text, chunk_size):
+    chunks = (text[start:start + chunk_size] for start in range(0, len(text), chunk_size))
+    return list(lab1.tokenizer.stream(chunks))
+
+
+class TokenizerTests(unittest.TestCase):
+    def test_chunkBoundaries(self):
+        text = 'invoc a=b!=c;\n@@x >= 10 || y<=z\n' * 3 + 'abc_1 @@@@ 0\n'
+        expected = scan_text(text, len(text))
+        self.assertIn(('!=', 'operator', lab1.token_codes.get('!='), 1, 9), expected)
+        for chunk_size in range(1, 12):
+            self.assertEqual(scan_text(text, chunk_size), expected)
+
+    def test_unmatchedCharactersAreNotKept(self):
+        chunks = ['@' * 1000] * 200 + ['!', '= x']
+        tracemalloc.start()
+        try:
+            tokens = [token[:2] for token in lab1.tokenizer.stream(iter(chunks)) if token[1] != 'error']
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(tokens, [('!=', 'operator'), (' ', 'delimiter'), ('x', 'identifier')])
+        # only the chunk being scanned is held, not the 200000 characters before which start no token
+        self.assertLess(peak, 50000)
+
+
+
+class DirectoryTests(unittest.TestCase):
+    def test_outputDoesNotDependOnWorkers(self):
+        programs = {'a.txt': 'invoc x = y + 1;\n', 'a.pas': 'char y;\nz = x;\n', 'b.txt': 'w = z * 2;\n'}
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'source')
+            os.makedirs(source)
+            for name, text in programs.items():
+                with open(os.path.join(source, name), 'w') as file:
+                    file.write(text)
+            outputs = {}
+            for workers in (1, 2):
+                output = os.path.join(directory, 'out{}'.format(workers))
+                with contextlib.redirect_stdout(io.StringIO()):
+                    lab1.analyze_directory_to_files(source, output, workers)
+                outputs[workers] = {}
+                for name in sorted(os.listdir(output)):
+                    with open(os.path.join(output, name), 'rb') as file:
+                        outputs[workers][name] = file.read()
+            self.assertEqual(sorted(os.listdir(source)), sorted(programs))
+            self.assertEqual(sorted(outputs[1]), ['a.pas.pif.bin', 'a.pas.pif.out', 'a.txt.pif.bin', 'a.txt.pif.out',
+                                                  'b.txt.pif.bin', 'b.txt.pif.out', 'sym.out'])
+            self.assertEqual(outputs[2], outputs[1])
+            # the symbol tables are merged in the order of the file names
+            symbol_table, _, _ = lab1.analyze_directory(source, 2)
+            self.assertEqual([key for key, _, _ in symbol_table.items()], ['y', 'z', 'x', 'w'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import itertools
+import os
+import random
+import unittest
+
+import lab4
+
+FA_IN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fa.in')
+
+
+def accepts(automaton, sequence):
+    """
+    Reference: the runs of the automaton followed one (state, position) pair at a time.
+    """
+    seen = set()
+    stack = [(automaton.initial_state, 0)]
+    while stack:
+        state, position = stack.pop()
+        if (state, position) in seen:
+            continue
+        seen.add((state, position))
+        if position == len(sequence) and state in automaton.final_states:
+            return True
+        stack.extend((target, position) for target in automaton.transition.get((state, lab4.EPSILON), []))
+        if position < len(sequence):
+            stack.extend((target, position + 1)
+                         for target in automaton.transition.get((state, sequence[position]), []))
+    return False
+
+
+def leftmost_longest(automaton, text):
+    position = 0
+    while position < len(text):
+        ends = [end for end in range(position + 1, len(text) + 1) if accepts(automaton, text[position:end])]
+        if ends:
+            yield position, ends[-1]
+            position = ends[-1]
+        else:
+            position += 1
+
+
+class CompiledAutomatonTests(unittest.TestCase):
+    def test_minimal(self):
+        # the remainder modulo 3 of a binary number, every remainder having two equivalent states
+        states = ['r{}{}'.format(remainder, copy) for remainder in range(3) for copy in range(2)]
+        transition = {('r{}{}'.format(remainder, copy), str(bit)): ['r{}{}'.format((2 * remainder + bit) % 3, 1 - copy)]
+                      for remainder in range(3) for copy in range(2) for bit in range(2)}
+        automaton = lab4.FiniteAutomaton.from_definition(states, '01', 'r00', ['r00', 'r01'], transition)
+        compiled = automaton.compile()
+        # three remainders and the dead state of the symbols outside the alphabet
+        self.assertEqual((compiled.report['dfa_states'], compiled.state_count), (7, 4))
+        for length in range(9):
+            for bits in itertools.product('01', repeat=length):
+                self.assertEqual(compiled.check(bits), int(''.join(bits) or '0', 2) % 3 == 0)
+        self.assertEqual(lab4.FiniteAutomaton(FA_IN).compile().state_count, 4)
+
+    def test_nondeterministicWithEpsilon(self):
+        # (a|b)*abb, the loop going back through an epsilon transition
+        transition = {('s', lab4.EPSILON): ['t'], ('t', 'a'): ['t', 'u'], ('t', 'b'): ['t'], ('u', 'b'): ['v'],
+                      ('v', 'b'): ['w'], ('w', lab4.EPSILON): ['s']}
+        automaton = lab4.FiniteAutomaton.from_definition('stuvw', 'ab', 's', ['w'], transition)
+        self.assertFalse(automaton.is_deterministic())
+        sequences = [''.join(symbols) for length in range(8) for symbols in itertools.product('ab', repeat=length)]
+        expected = [accepts(automaton, sequence) for sequence in sequences]
+        self.assertEqual([automaton.check_sequence(sequence) for sequence in sequences], expected)
+        self.assertEqual(automaton.check_batch(sequences), expected)
+        self.assertEqual(expected, [sequence.endswith('abb') for sequence in sequences])
+        self.assertEqual(automaton.compile().state_count, 5)
+
+    def test_search(self):
+        automaton = lab4.FiniteAutomaton(FA_IN)
+        generator = random.Random(22)
+        for _ in range(200):
+            text = ''.join(generator.choice('01') for _ in range(generator.randint(0, 24)))
+            overlapping = sorted(((start, end) for start in range(len(text)) for end in range(start + 1, len(text) + 1)
+                                  if accepts(automaton, text[start:end])), key=lambda span: (span[1], span[0]))
+            self.assertEqual(list(automaton.search(text, overlapping=True)), overlapping, text)
+            self.assertEqual(list(automaton.search(iter(text))), list(leftmost_longest(automaton, text)), text)
+
+
+class MatcherTests(unittest.TestCase):
+    def test_cacheFlushedDuringRun(self):
+        # the symbol 14 positions from the end is a: 2 ** 14 subsets, more than the LazyDfa keeps
+        distance = 14
+        states = ['s{}'.format(index) for index in range(distance + 1)]
+        transition = {('s0', 'a'): ['s0', 's1'], ('s0', 'b'): ['s0']}
+        for index in range(1, distance):
+            for symbol in 'ab':
+                transition[(states[index], symbol)] = [states[index + 1]]
+        automaton = lab4.FiniteAutomaton.from_definition(states, 'ab', 's0', [states[-1]], transition)
+        generator = random.Random(0)
+        text = ''.join(generator.choice('ab') for _ in range(60000))
+        first, second = automaton.matcher(), automaton.matcher()
+        for start in range(0, len(text), 1000):
+            self.assertTrue(first.feed(text[start:start + 1000]))
+            self.assertTrue(second.feed(text[start:start + 500]))
+            self.assertEqual(first.accepted, text[start + 1000 - distance] == 'a')
+            self.assertEqual(second.accepted, text[start + 500 - distance] == 'a')
+            second.reset()
+        self.assertGreater(automaton.lazy_dfa().flushes, 0)
+        self.assertEqual(first.position, len(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
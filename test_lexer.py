@@ -0,0 +1,60 @@
+import random
+import re
+import unittest
+
+import lab1
+from lexer import LexerGenerator, lab1_specification
+
+
+def longest_match(specification, text):
+    """
+    Reference scanner: at every position the longest prefix matched by a pattern, the first pattern winning a tie.
+    """
+    patterns = [re.compile(pattern) for _, pattern in specification]
+    position = 0
+    while position < len(text):
+        for end in range(len(text), position, -1):
+            kind = next((specification[index][0] for index, pattern in enumerate(patterns)
+                         if pattern.fullmatch(text, position, end)), None)
+            if kind is not None:
+                yield kind, text[position:end], position
+                position = end
+                break
+        else:
+            yield None, text[position], position
+            position += 1
+
+
+class LexerTests(unittest.TestCase):
+    def setUp(self):
+        self.specification = lab1_specification(lab1.keywords, lab1.operators, lab1.delimiters)
+        self.lexer = LexerGenerator(self.specification).lexer()
+
+    def test_longestMatch(self):
+        self.assertEqual([token for _, token, _ in self.lexer.tokens('a =-f<=3.5;"hi"')],
+                         ['a', ' ', '=', '-', 'f', '<=', '3.5', ';', '"hi"'])
+        self.assertEqual(next(self.lexer.tokens('invocx')), ('identifier', 'invocx', 0))
+
+    def test_translatedKinds(self):
+        kinds = {kind: index for index, (kind, _) in enumerate(self.specification)}
+        kinds[None] = -1
+        lexer = LexerGenerator(self.specification).lexer(kinds)
+        self.assertEqual(list(lexer.tokens('a@<=')),
+                         [(kinds['identifier'], 'a', 0), (-1, '@', 1), (kinds['<='], '<=', 2)])
+
+    def test_matchesReference(self):
+        alphabet = 'aiz09_.+-*=!<>|"\' ;(\n@'
+        pieces = lab1.keywords + lab1.operators + ['3.5', '"hi"', "'x'"]
+        generator = random.Random(14)
+        for _ in range(3000):
+            text = ''.join(generator.choice(alphabet) if generator.random() < 0.8 else generator.choice(pieces)
+                           for _ in range(generator.randint(0, 12)))
+            expected = list(longest_match(self.specification, text))
+            self.assertEqual(list(self.lexer.tokens(text)), expected, text)
+            size = generator.randint(1, 4)
+            chunks = (text[start:start + size] for start in range(0, len(text), size))
+            self.assertEqual(list(self.lexer.stream(chunks)), expected, text)
+
+
+if __name__ == '__main__':
+    unittest.main()
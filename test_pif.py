@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import pif
+
+
+class SymbolTable:
+    def __init__(self, items):
+        self._items = items
+
+    def items(self):
+        return iter(self._items)
+
+
+class PifFileTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_name = os.path.join(self.directory.name, 'p.pif.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_roundTrip(self):
+        records = [('x', 0, (3, 0)), ('=', 20, None), ('10', 1, None), ('ă', 0, (7, 1)), (';', 47, None)]
+        symbols = [('x', 'identifier', (3, 0)), ('ă', 'identifier', (7, 1))]
+        pif.write(self.file_name, records, SymbolTable(symbols))
+        with pif.PifFile(self.file_name) as binary:
+            self.assertEqual(list(binary), ['identifier', '=', 'constant', 'identifier', ';'])
+            self.assertEqual(binary[1:3], ['=', 'constant'])
+            self.assertEqual(list(binary.records()), records)
+            self.assertEqual(list(binary.symbols()), symbols)
+        text_name = os.path.join(self.directory.name, 'p.pif.out')
+        pif.binary_to_text(self.file_name, text_name)
+        self.assertEqual(list(pif.read_text(text_name)), records)
+        copy_name = os.path.join(self.directory.name, 'copy.pif.bin')
+        pif.text_to_binary(text_name, copy_name, SymbolTable(symbols))
+        with open(self.file_name, 'rb') as original, open(copy_name, 'rb') as copy:
+            self.assertEqual(copy.read(), original.read())
+
+    def test_empty(self):
+        pif.write(self.file_name, [])
+        with pif.PifFile(self.file_name) as binary:
+            self.assertEqual(len(binary), 0)
+            self.assertEqual(list(binary.records()), [])
+            self.assertEqual(list(binary.symbols()), [])
+        open(self.file_name, 'wb').close()
+        self.assertRaises(ValueError, pif.PifFile, self.file_name)
+
+    def test_truncated(self):
+        pif.write(self.file_name, [('x', 0, (3, 0)), ('=', 20, None)], SymbolTable([('x', 'identifier', (3, 0))]))
+        with open(self.file_name, 'rb') as file:
+            content = file.read()
+        for size in (len(content) - 4, len(content) // 2, pif.HEADER.size, pif.HEADER.size - 1):
+            with open(self.file_name, 'wb') as file:
+                file.write(content[:size])
+            self.assertRaises(ValueError, pif.PifFile, self.file_name)
+
+    def test_closed(self):
+        pif.write(self.file_name, [('x', 0, (3, 0))])
+        binary = pif.PifFile(self.file_name)
+        binary.close()
+        self.assertTrue(binary.closed)
+        self.assertRaises(ValueError, len, binary)
+        self.assertRaises(ValueError, binary.__getitem__, 0)
+        self.assertRaises(ValueError, binary.record, 0)
+        self.assertRaises(ValueError, list, binary.symbols())
+        self.assertIn('closed', repr(binary))
+
+
+if __name__ == '__main__':
+    unittest.main()